@@ -5,18 +5,362 @@ Multi-Client Support for Announcements, Roof Status, and Camera Updates
 Add these functions to raspberry-pi/collector.py
 """
 
+import os
 import requests
+import hashlib
 import json
+import random
+import sqlite3
+import threading
 import time
 import logging
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+
+    def _dumps(payload: dict) -> bytes:
+        return orjson.dumps(payload)
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    def _dumps(payload: dict) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
 logger = logging.getLogger(__name__)
 
+
+def _iso_utc(epoch: float) -> str:
+    """Format a Unix timestamp as an ISO-8601 UTC string (second precision)."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat(timespec="seconds")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HTTP SESSION (shared by all announcement / roof helpers)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Pooled session so the monitor thread and push loop reuse sockets and TLS
+# sessions instead of paying a fresh handshake for every update.
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Return the shared API session, creating it on first use."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.mount(
+            CONFIG["remote_api"],
+            HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0),
+        )
+        session.headers.update({
+            "Authorization": f"Bearer {CONFIG['api_key']}",
+            "Content-Type": "application/json",
+        })
+        _session = session
+    return _session
+
+
+# Single background worker for API calls. Callers that must not block on the
+# network (roof monitor, push loop) submit() instead of calling helpers
+# directly. One worker keeps roof updates in order.
+_api_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="client-api")
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Run an announcement/roof helper on the background API worker."""
+    return _api_executor.submit(fn, *args, **kwargs)
+
+
+class CircuitBreaker:
+    """
+    Process-local circuit breaker for calls to the remote API.
+
+    States:
+    - CLOSED: requests flow normally
+    - OPEN: after FAILURE_THRESHOLD consecutive failures, requests fail fast
+      without touching the network for RESET_TIMEOUT seconds
+    - HALF_OPEN: after the cool-down one trial request is let through;
+      success closes the breaker, failure re-opens it
+    """
+
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30  # seconds
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "CLOSED"
+        self.failure_count = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> Optional[str]:
+        """
+        Return the state a request may be attempted under: "CLOSED", or
+        "HALF_OPEN" for the single trial request. None means fail fast.
+        """
+        with self._lock:
+            if self.state == "OPEN":
+                if time.time() - self.opened_at < self.RESET_TIMEOUT:
+                    return None
+                self.state = "HALF_OPEN"
+                return "HALF_OPEN"
+            if self.state == "HALF_OPEN":
+                # Only one trial request at a time
+                return None
+            return "CLOSED"
+
+    def record_success(self) -> None:
+        """Record a successful request and close the breaker."""
+        with self._lock:
+            self.state = "CLOSED"
+            self.failure_count = 0
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker if needed."""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == "HALF_OPEN" or self.failure_count >= self.FAILURE_THRESHOLD:
+                if self.state != "OPEN":
+                    logger.warning(f"API circuit breaker OPEN for {self.RESET_TIMEOUT}s")
+                self.state = "OPEN"
+                self.opened_at = time.time()
+
+
+# Global breaker shared by all announcement / roof helpers
+api_breaker = CircuitBreaker()
+
+
+# Retry policy for transient failures (5xx, 429, connection errors, timeouts).
+# 4xx responses are never retried - they will not succeed on a second attempt.
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 30.0  # seconds
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# (connect, read) timeouts - fail fast on an unreachable server
+REQUEST_TIMEOUT = (3, 10)
+
+
+def _post_json(method: str, url: str, payload: dict) -> Optional[requests.Response]:
+    """
+    Send a JSON request, retrying transient failures with exponential
+    backoff and full jitter.
+
+    Returns the final response (which may still be a non-2xx status), or
+    None without touching the network if the circuit breaker is open.
+    Re-raises the last error if every attempt fails.
+
+    Every call records exactly one result on the breaker; any exception
+    counts as a failure. The half-open trial request is sent once, without
+    retries, since all other callers are refused until it reports back.
+    """
+    state = api_breaker.allow()
+    if state is None:
+        logger.debug(f"{method} {url} skipped, circuit breaker open")
+        return None
+
+    attempts = 1 if state == "HALF_OPEN" else RETRY_ATTEMPTS + 1
+    recorded = False
+    try:
+        body = _dumps(payload)
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = get_session().request(method, url, data=body, timeout=REQUEST_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise
+                logger.debug(f"{method} {url} failed ({e}), retrying")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    api_breaker.record_success()
+                    recorded = True
+                    return response
+                if last:
+                    api_breaker.record_failure()
+                    recorded = True
+                    return response
+                logger.debug(f"{method} {url} returned {response.status_code}, retrying")
+
+            # Full jitter: sleep a random amount up to the exponential ceiling
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+    finally:
+        if not recorded:
+            api_breaker.record_failure()
+
+
+def _call_api(method: str, path: str, payload: dict, action: str) -> bool:
+    """
+    Send a request to the remote API and report whether it was accepted.
+
+    Handles the API key check, retries, circuit breaker and error logging
+    for every announcement / roof helper.
+
+    Args:
+        method: HTTP method ("POST" or "PUT")
+        path: Path below REMOTE_API_URL, e.g. "/clients/springbrook/roof"
+        payload: JSON body
+        action: Short description for log messages, e.g. "roof status update"
+
+    Returns:
+        True on a 2xx response, False otherwise
+    """
+    if not CONFIG["api_key"]:
+        logger.warning(f"No API key configured, skipping {action}")
+        return False
+
+    try:
+        response = _post_json(method, f"{CONFIG['remote_api']}{path}", payload)
+    except Exception as e:
+        logger.error(f"Error sending {action}: {e}")
+        return False
+
+    if response is None:
+        return False
+    if not response.ok:
+        logger.warning(f"Failed to send {action}: {response.status_code} - {response.text}")
+        return False
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EVENT BATCHING (optional)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# When BATCH_MODE=true, announcements and roof updates are queued and sent in a
+# single POST /clients/{slug}/events per push cycle instead of one request each.
+BATCH_MODE = os.getenv("BATCH_MODE", "false").lower() == "true"
+EVENT_QUEUE_SIZE = 256
+
+# Entries are (client_slug, {"kind": ..., "payload": ...}, dedupe); oldest
+# dropped on overflow. dedupe is the announcement's (cache key, expires_hours),
+# recorded only once the batch holding it has been accepted.
+EVENT_QUEUE: deque = deque(maxlen=EVENT_QUEUE_SIZE)
+# Held while appending or re-queueing, so a re-queue can size itself safely
+_event_queue_lock = threading.Lock()
+
+
+def enqueue_event(client_slug: str, kind: str, payload: dict, dedupe: Optional[tuple] = None) -> None:
+    """Queue an event ("announcement" or "roof_status") for the next flush."""
+    with _event_queue_lock:
+        EVENT_QUEUE.append((client_slug, {"kind": kind, "payload": payload}, dedupe))
+
+
+def _is_announcement_queued(cache_key: str) -> bool:
+    """Return True if an identical announcement is already waiting to be flushed."""
+    return any(dedupe and dedupe[0] == cache_key for _, _, dedupe in list(EVENT_QUEUE))
+
+
+def flush_events() -> bool:
+    """
+    Send all queued events, one batched request per client.
+    Call at the end of each push_data() iteration.
+
+    Returns:
+        True if every batch was accepted (or there was nothing to send)
+    """
+    if not EVENT_QUEUE:
+        return True
+
+    # Drain the queue, grouping entries by client
+    batches: dict = {}
+    while EVENT_QUEUE:
+        try:
+            entry = EVENT_QUEUE.popleft()
+        except IndexError:
+            break
+        batches.setdefault(entry[0], []).append(entry)
+
+    all_ok = True
+    for client_slug, entries in batches.items():
+        events = [event for _, event, _ in entries]
+        if _call_api("POST", f"/clients/{client_slug}/events", {"events": events}, "event batch"):
+            logger.debug(f"Flushed {len(events)} events to {client_slug}")
+            # Only now are the announcements actually published
+            for _, _, dedupe in entries:
+                if dedupe:
+                    _remember_announcement(*dedupe)
+            continue
+
+        # Put the batch back for the next cycle. extendleft() on a full
+        # deque would evict from the right (the newest events), so trim the
+        # oldest re-queued entries to the free space instead
+        all_ok = False
+        with _event_queue_lock:
+            room = EVENT_QUEUE_SIZE - len(EVENT_QUEUE)
+            kept = entries[max(0, len(entries) - room):] if room > 0 else []
+            EVENT_QUEUE.extendleft(reversed(kept))
+        if len(kept) < len(entries):
+            logger.warning(f"Event queue full, dropped {len(entries) - len(kept)} oldest events for {client_slug}")
+
+    return all_ok
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ANNOUNCEMENTS (Message of the Day, Planned Outages, Maintenance)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Recently published announcements are kept in a small sqlite file
+# (key = content hash, value = expiry epoch) so the dedupe survives restarts.
+# Identical announcements are not re-sent until the previous one expires.
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache.db"))
+ANNOUNCE_CACHE_DEFAULT_TTL = 3600  # seconds, for announcements with no expiry
+_cache_conn: Optional[sqlite3.Connection] = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache_db() -> sqlite3.Connection:
+    """Open the local cache database on first use (caller holds _cache_lock)."""
+    global _cache_conn
+    if _cache_conn is None:
+        try:
+            conn = sqlite3.connect(CACHE_DB_PATH, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            logger.warning(f"Cache DB unavailable at {CACHE_DB_PATH} ({e}), using in-memory cache")
+            conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS announce_cache (key TEXT PRIMARY KEY, expires_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache (url TEXT PRIMARY KEY, etag TEXT, body TEXT)"
+        )
+        _cache_conn = conn
+    return _cache_conn
+
+
+def _announcement_key(client_slug: str, title: str, content: str) -> str:
+    """Build the dedupe cache key for an announcement."""
+    return hashlib.blake2s(f"{client_slug}|{title}|{content}".encode()).hexdigest()
+
+
+def _is_recently_announced(key: str) -> bool:
+    """Return True if an identical announcement is still live."""
+    with _cache_lock:
+        row = _get_cache_db().execute(
+            "SELECT expires_at FROM announce_cache WHERE key = ?", (key,)
+        ).fetchone()
+    return row is not None and row[0] > time.time()
+
+
+def _remember_announcement(key: str, expires_hours: Optional[int]) -> None:
+    """Record a published announcement, pruning expired entries."""
+    now = time.time()
+    ttl = expires_hours * 3600 if expires_hours else ANNOUNCE_CACHE_DEFAULT_TTL
+    with _cache_lock:
+        db = _get_cache_db()
+        db.execute("DELETE FROM announce_cache WHERE expires_at <= ?", (now,))
+        db.execute(
+            "INSERT OR REPLACE INTO announce_cache (key, expires_at) VALUES (?, ?)",
+            (key, now + ttl),
+        )
+
+
 def publish_announcement(
     client_slug: str,
     title: str,
@@ -39,14 +383,13 @@ def publish_announcement(
         expires_hours: Hours until announcement expires (None = no expiration)
 
     Returns:
-        True if successful, False otherwise
+        True if successful (or an identical announcement is still live),
+        False otherwise
     """
-    api_url = CONFIG["remote_api"]
-    api_key = CONFIG["api_key"]
-
-    if not api_key:
-        logger.warning("No API key configured, skipping announcement")
-        return False
+    cache_key = _announcement_key(client_slug, title, content)
+    if _is_recently_announced(cache_key):
+        logger.debug(f"Announcement already live for {client_slug}: {title}")
+        return True
 
     payload = {
         "title": title,
@@ -58,35 +401,58 @@ def publish_announcement(
     }
 
     if expires_hours:
-        expires_at = (datetime.utcnow() + timedelta(hours=expires_hours)).isoformat()
-        payload["expires_at"] = expires_at
+        payload["expires_at"] = _iso_utc(time.time() + expires_hours * 3600)
 
-    try:
-        response = requests.post(
-            f"{api_url}/clients/{client_slug}/announcements",
-            json=payload,
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=30,
-        )
+    if BATCH_MODE:
+        # Remembered by flush_events() once /events accepts it, so an event
+        # dropped from the bounded queue is not hidden by the dedupe cache
+        if not _is_announcement_queued(cache_key):
+            enqueue_event(client_slug, "announcement", payload, dedupe=(cache_key, expires_hours))
+        return True
 
-        if response.ok:
-            logger.info(f"Announcement published to {client_slug}: {title}")
-            return True
-        else:
-            logger.warning(
-                f"Failed to publish announcement: {response.status_code} - {response.text}"
-            )
-            return False
-
-    except Exception as e:
-        logger.error(f"Error publishing announcement: {e}")
+    if not _call_api("POST", f"/clients/{client_slug}/announcements", payload, "announcement"):
         return False
 
+    logger.info(f"Announcement published to {client_slug}: {title}")
+    _remember_announcement(cache_key, expires_hours)
+    return True
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # EXAMPLES: Common Announcements
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# HTML bodies, built once and filled with str.format()
+_MAINTENANCE_TEMPLATE = (
+    "<p><strong>Scheduled maintenance:</strong></p>"
+    "<p>{details}</p>"
+    "<p>Expected duration: {hours} hours</p>"
+    "<p>Observatory will be offline during this time.</p>"
+)
+_POWER_OUTAGE_TEMPLATE = (
+    "<p><strong>Power outage detected!</strong></p>"
+    "<p>{duration_text}</p>"
+    "<p>Observatory is on battery backup. Normal operations will resume when power is restored.</p>"
+)
+_POOR_CONDITIONS_TEMPLATE = (
+    "<p><strong>Current conditions are unfavorable for observations.</strong></p>"
+    "<p>Reason: {reason}</p>"
+    "<p>Check the dashboard for current weather details.</p>"
+)
+_DAILY_STATUS_TEMPLATE = (
+    "<p><strong>Observatory Status - {date}</strong></p>"
+    "<ul>"
+    "<li>System: {hostname}</li>"
+    "<li>Uptime: {uptime_hours:.1f} hours</li>"
+    "<li>Status: Operational</li>"
+    "</ul>"
+)
+_MAINTENANCE_REMINDER_TEMPLATE = (
+    "<p>Scheduled maintenance in {days} days.</p>"
+    "<p>Date/Time: {when}</p>"
+)
+
+
 def announce_startup(client_slug: str):
     """Announce that the observatory is online."""
     publish_announcement(
@@ -106,12 +472,7 @@ def announce_planned_maintenance(
     publish_announcement(
         client_slug=client_slug,
         title=f"Planned Maintenance - {start_time}",
-        content=f"""
-        <p><strong>Scheduled maintenance:</strong></p>
-        <p>{details}</p>
-        <p>Expected duration: {duration_hours} hours</p>
-        <p>Observatory will be offline during this time.</p>
-        """,
+        content=_MAINTENANCE_TEMPLATE.format(details=details, hours=duration_hours),
         announcement_type="maintenance",
         priority=2,
         is_motd=True,
@@ -130,11 +491,7 @@ def announce_power_outage(client_slug: str, duration_estimate: int = None):
     publish_announcement(
         client_slug=client_slug,
         title="⚠️ Power Outage",
-        content=f"""
-        <p><strong>Power outage detected!</strong></p>
-        <p>{duration_text}</p>
-        <p>Observatory is on battery backup. Normal operations will resume when power is restored.</p>
-        """,
+        content=_POWER_OUTAGE_TEMPLATE.format(duration_text=duration_text),
         announcement_type="alert",
         priority=3,
         is_motd=True,
@@ -146,11 +503,7 @@ def announce_poor_conditions(client_slug: str, reason: str):
     publish_announcement(
         client_slug=client_slug,
         title="⛅ Poor Observing Conditions",
-        content=f"""
-        <p><strong>Current conditions are unfavorable for observations.</strong></p>
-        <p>Reason: {reason}</p>
-        <p>Check the dashboard for current weather details.</p>
-        """,
+        content=_POOR_CONDITIONS_TEMPLATE.format(reason=reason),
         announcement_type="warning",
         priority=1,
         expires_hours=4,
@@ -181,13 +534,6 @@ def update_roof_status(
     Returns:
         True if successful, False otherwise
     """
-    api_url = CONFIG["remote_api"]
-    api_key = CONFIG["api_key"]
-
-    if not api_key:
-        logger.warning("No API key configured, skipping roof status update")
-        return False
-
     payload = {
         "state": state,
         "is_operational": is_operational,
@@ -199,26 +545,70 @@ def update_roof_status(
     if error_message:
         payload["error_message"] = error_message
 
+    if BATCH_MODE:
+        enqueue_event(client_slug, "roof_status", payload)
+        return True
+
+    if not _call_api("PUT", f"/clients/{client_slug}/roof", payload, "roof status update"):
+        return False
+
+    logger.debug(f"Roof status updated for {client_slug}: {state}")
+    return True
+
+
+def fetch_roof_status(client_slug: str) -> Optional[dict]:
+    """
+    Fetch the server's current roof status for a client.
+
+    Uses a conditional GET: the last ETag and body are kept in the local
+    cache DB, and a 304 Not Modified reuses the cached body.
+
+    Returns:
+        Roof status dict, or None if unavailable
+    """
+    if not CONFIG["api_key"]:
+        logger.warning("No API key configured, skipping roof status fetch")
+        return None
+
+    url = f"{CONFIG['remote_api']}/clients/{client_slug}/roof"
+
+    with _cache_lock:
+        cached = _get_cache_db().execute(
+            "SELECT etag, body FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
     try:
-        response = requests.put(
-            f"{api_url}/clients/{client_slug}/roof",
-            json=payload,
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=30,
-        )
+        response = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        logger.warning(f"Error fetching roof status: {e}")
+        return None
 
-        if response.ok:
-            logger.debug(f"Roof status updated for {client_slug}: {state}")
-            return True
-        else:
-            logger.warning(
-                f"Failed to update roof status: {response.status_code} - {response.text}"
+    if response.status_code == 304 and cached:
+        return json.loads(cached[1])
+
+    if not response.ok:
+        logger.warning(f"Failed to fetch roof status: {response.status_code}")
+        return None
+
+    try:
+        data = response.json().get("data")
+    except (ValueError, AttributeError):
+        # A 200 that isn't a JSON object, e.g. a proxy's HTML error page
+        logger.warning("Failed to fetch roof status: response is not a JSON object")
+        return None
+    etag = response.headers.get("ETag")
+    if etag and data is not None:
+        with _cache_lock:
+            _get_cache_db().execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, body) VALUES (?, ?, ?)",
+                (url, etag, json.dumps(data)),
             )
-            return False
+    return data
 
-    except Exception as e:
-        logger.error(f"Error updating roof status: {e}")
-        return False
+
+VALID_ROOF_COMMANDS = frozenset(("open", "close", "stop"))
 
 
 def send_roof_command(client_slug: str, command: str, issued_by: str = "system") -> bool:
@@ -233,59 +623,70 @@ def send_roof_command(client_slug: str, command: str, issued_by: str = "system")
     Returns:
         True if command was accepted
     """
-    api_url = CONFIG["remote_api"]
-    api_key = CONFIG["api_key"]
-
-    if command not in ["open", "close", "stop"]:
+    if command not in VALID_ROOF_COMMANDS:
         logger.error(f"Invalid roof command: {command}")
         return False
 
-    if not api_key:
-        logger.warning("No API key configured, skipping roof command")
-        return False
-
     payload = {
         "command": command,
         "issued_by": issued_by,
     }
 
-    try:
-        response = requests.post(
-            f"{api_url}/clients/{client_slug}/roof/command",
-            json=payload,
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=30,
-        )
-
-        if response.ok:
-            logger.info(f"Roof command sent: {command}")
-            return True
-        else:
-            logger.warning(
-                f"Failed to send roof command: {response.status_code} - {response.text}"
-            )
-            return False
-
-    except Exception as e:
-        logger.error(f"Error sending roof command: {e}")
+    if not _call_api("POST", f"/clients/{client_slug}/roof/command", payload, "roof command"):
         return False
 
+    logger.info(f"Roof command sent: {command}")
+    return True
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ROOF STATUS MONITORING (GPIO-based example)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-import RPi.GPIO as GPIO
-
-# Configure GPIO pins
+# Configure GPIO pins (BCM line offsets on the GPIO chip)
+ROOF_GPIO_CHIP = "/dev/gpiochip0"
 ROOF_OPEN_PIN = 17  # Limit switch for roof open
 ROOF_CLOSED_PIN = 27  # Limit switch for roof closed
 ROOF_MOVING_PIN = 22  # Status pin indicating roof is moving
 
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(ROOF_OPEN_PIN, GPIO.IN)
-GPIO.setup(ROOF_CLOSED_PIN, GPIO.IN)
-GPIO.setup(ROOF_MOVING_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+# Max seconds to block waiting for an edge before re-checking SHUTDOWN
+ROOF_EVENT_WAIT = 5
+
+# libgpiod line request, created by _init_gpio() only when roof monitoring starts
+_roof_lines = None
+
+
+def _init_gpio():
+    """
+    Request the roof pins from libgpiod (v2 bindings) with edge detection.
+
+    All three lines share one request, so the kernel delivers their edge
+    events on a single file descriptor - no per-pin callback threads.
+    """
+    global _roof_lines
+    if _roof_lines is None:
+        import gpiod
+        from gpiod.line import Bias, Direction, Edge
+
+        debounce = timedelta(milliseconds=200)
+        _roof_lines = gpiod.request_lines(
+            ROOF_GPIO_CHIP,
+            consumer="roof-monitor",
+            config={
+                (ROOF_OPEN_PIN, ROOF_CLOSED_PIN): gpiod.LineSettings(
+                    direction=Direction.INPUT,
+                    edge_detection=Edge.BOTH,
+                    debounce_period=debounce,
+                ),
+                ROOF_MOVING_PIN: gpiod.LineSettings(
+                    direction=Direction.INPUT,
+                    edge_detection=Edge.BOTH,
+                    bias=Bias.PULL_UP,
+                    debounce_period=debounce,
+                ),
+            },
+        )
+    return _roof_lines
 
 
 def read_roof_state() -> tuple[str, int | None]:
@@ -297,9 +698,12 @@ def read_roof_state() -> tuple[str, int | None]:
         - state: "open", "closed", "opening", "closing", or "unknown"
         - position: 0-100 percent, or None if unavailable
     """
-    open_switch = GPIO.input(ROOF_OPEN_PIN)
-    closed_switch = GPIO.input(ROOF_CLOSED_PIN)
-    moving = not GPIO.input(ROOF_MOVING_PIN)  # Low = moving
+    from gpiod.line import Value
+
+    values = _init_gpio().get_values([ROOF_OPEN_PIN, ROOF_CLOSED_PIN, ROOF_MOVING_PIN])
+    open_switch = values[0] == Value.ACTIVE
+    closed_switch = values[1] == Value.ACTIVE
+    moving = values[2] == Value.INACTIVE  # Low = moving
 
     if moving:
         # Roof is in motion, determine direction from previous state
@@ -319,24 +723,71 @@ def read_roof_state() -> tuple[str, int | None]:
         return "unknown", None
 
 
-def roof_monitor_thread(client_slug: str, interval: int = 10):
+def _wait_for_roof_edge(lines, timeout: float) -> bool:
+    """
+    Block until a roof pin changes, timeout elapses, or SHUTDOWN is set.
+    Returns True if edge events were received.
+    """
+    deadline = time.monotonic() + timeout
+    while not SHUTDOWN.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if lines.wait_edge_events(min(remaining, ROOF_EVENT_WAIT)):
+            lines.read_edge_events()  # Drain; state is re-read from line values
+            return True
+    return False
+
+
+# Minimum seconds between repeated identical error publishes, and between
+# read retries after an error (grows per repeat)
+ROOF_ERROR_BACKOFF = (10, 60, 300)
+
+# Set by the host's shutdown path so the monitor exits promptly instead of
+# finishing its wait. This module installs no signal handlers: in collector.py,
+# main()'s KeyboardInterrupt handler (which SIGTERM also reaches) should call
+# SHUTDOWN.set() next to shutdown_event.set().
+SHUTDOWN = threading.Event()
+
+
+def roof_monitor_thread(client_slug: str, heartbeat_interval: int = 300):
     """
-    Monitor roof status continuously and push updates.
+    Monitor roof status and push updates.
+
+    The limit switch and motion pins are edge-triggered, so the pins are only
+    read when one of them changes. A status update is also re-sent every
+    heartbeat_interval seconds so the dashboard knows the monitor is alive.
 
     Args:
         client_slug: Client to report status for
-        interval: Seconds between checks
+        heartbeat_interval: Seconds between liveness updates when idle
     """
     logger.info(f"Starting roof monitor for {client_slug}")
     last_state = None
+    edge_triggered = True
+    last_error = None
+    last_error_published = 0.0
+    error_repeats = 0
 
-    while True:
+    lines = _init_gpio()
+
+    # Start from the server's view so an unchanged roof is not re-published.
+    # Best effort: without it the first reading is simply published.
+    try:
+        server_status = fetch_roof_status(client_slug)
+        if server_status:
+            last_state = server_status.get("state")
+    except Exception as e:
+        logger.warning(f"Could not fetch initial roof status: {e}")
+
+    while not SHUTDOWN.is_set():
         try:
             state, position = read_roof_state()
 
-            # Only push if state changed
-            if state != last_state:
-                update_roof_status(
+            # Push on change, or as a heartbeat when nothing has moved
+            if state != last_state or not edge_triggered:
+                submit(
+                    update_roof_status,
                     client_slug=client_slug,
                     state=state,
                     position=position,
@@ -344,40 +795,72 @@ def roof_monitor_thread(client_slug: str, interval: int = 10):
                 )
                 last_state = state
 
+            last_error = None
+            error_repeats = 0
+
+            # Sleep until a pin changes, the heartbeat is due, or shutdown
+            edge_triggered = _wait_for_roof_edge(lines, heartbeat_interval)
+
         except Exception as e:
-            logger.error(f"Error reading roof state: {e}")
-            update_roof_status(
-                client_slug=client_slug,
-                state="unknown",
-                error_message=str(e),
-                is_operational=False,
-            )
+            error = str(e)
+            backoff = ROOF_ERROR_BACKOFF[min(error_repeats, len(ROOF_ERROR_BACKOFF) - 1)]
+
+            # Publish new errors immediately; throttle repeats of the same one
+            if error != last_error or time.time() - last_error_published >= backoff:
+                logger.error(f"Error reading roof state: {e}")
+                submit(
+                    update_roof_status,
+                    client_slug=client_slug,
+                    state="unknown",
+                    error_message=error,
+                    is_operational=False,
+                )
+                error_repeats = error_repeats + 1 if error == last_error else 0
+                last_error = error
+                last_error_published = time.time()
+                last_state = None  # Re-publish the real state once reads recover
+            else:
+                logger.debug(f"Error reading roof state (repeat): {e}")
 
-        time.sleep(interval)
+            # Retry on the backoff schedule rather than waiting for an edge
+            # that a failing GPIO read may never deliver
+            retry = ROOF_ERROR_BACKOFF[min(error_repeats, len(ROOF_ERROR_BACKOFF) - 1)]
+            SHUTDOWN.wait(min(retry, heartbeat_interval))
+            edge_triggered = False
+
+    logger.info("Roof monitor stopped")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Startup code
 # ─────────────────────────────────────────────────────────────────────────────
 
-# Start roof monitoring in background thread
-import threading
+def main():
+    """
+    Start roof monitoring in a background thread if enabled.
 
-client_slug = os.getenv("CLIENT_SLUG", "springbrook")
-if os.getenv("ROOF_MONITORING_ENABLED", "false").lower() == "true":
-    roof_thread = threading.Thread(
-        target=roof_monitor_thread,
-        args=(client_slug, int(os.getenv("ROOF_CHECK_INTERVAL", "10"))),
-        daemon=True,
-    )
-    roof_thread.start()
-    logger.info("Roof monitoring started")
+    Call from the collector's main() - importing this module has no side
+    effects (no threads, no GPIO access). On shutdown, the collector sets
+    SHUTDOWN so the monitor stops.
+    """
+    client_slug = os.getenv("CLIENT_SLUG", "springbrook")
+    if os.getenv("ROOF_MONITORING_ENABLED", "false").lower() == "true":
+        roof_thread = threading.Thread(
+            target=roof_monitor_thread,
+            args=(client_slug, int(os.getenv("ROOF_HEARTBEAT_INTERVAL", "300"))),
+            daemon=True,
+        )
+        roof_thread.start()
+        logger.info("Roof monitoring started")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # INTEGRATION WITH MAIN PUSH LOOP
 # ═══════════════════════════════════════════════════════════════════════════════
 
+HIGH_WIND_THRESHOLD = 20  # km/h
+
+
 def check_and_announce_conditions(client_slug: str, current_conditions: dict):
     """
     Check conditions and auto-publish announcements if needed.
@@ -385,14 +868,19 @@ def check_and_announce_conditions(client_slug: str, current_conditions: dict):
     Called from main push loop with current weather data.
     """
     # Example: Announce if conditions become unfavorable
-    cloud_condition = current_conditions.get("cloud_condition", "Unknown")
-    wind_speed = current_conditions.get("wind_speed", 0)
+    very_cloudy = current_conditions.get("cloud_condition") == "VeryCloudy"
+    wind_speed = current_conditions.get("wind_speed") or 0
+    high_wind = wind_speed > HIGH_WIND_THRESHOLD
 
-    if cloud_condition == "VeryCloudy":
-        announce_poor_conditions(client_slug, "Heavy cloud cover detected")
+    # Usual case: nothing to announce
+    if not (very_cloudy or high_wind):
+        return
 
-    if wind_speed and wind_speed > 20:
-        announce_poor_conditions(client_slug, f"High winds: {wind_speed} km/h")
+    if very_cloudy:
+        submit(announce_poor_conditions, client_slug, "Heavy cloud cover detected")
+
+    if high_wind:
+        submit(announce_poor_conditions, client_slug, f"High winds: {wind_speed} km/h")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -412,6 +900,9 @@ def push_data():
         
         # Push to Vercel
         requests.post(f"{api_url}/ingest/data", json=combined_data, ...)
+
+        # NEW: Send queued announcements/roof updates (BATCH_MODE=true)
+        flush_events()
         
         time.sleep(push_interval)
 """
@@ -420,6 +911,19 @@ def push_data():
 # CRON-LIKE EXAMPLES (if running on systemd with timers)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# /proc/uptime is kept open and re-read from offset 0 on each call
+_uptime_fd: Optional[int] = None
+
+
+def get_uptime_seconds() -> float:
+    """Return system uptime in seconds from /proc/uptime."""
+    global _uptime_fd
+    if _uptime_fd is None:
+        _uptime_fd = os.open("/proc/uptime", os.O_RDONLY)
+    os.lseek(_uptime_fd, 0, os.SEEK_SET)
+    return float(os.read(_uptime_fd, 64).split(b" ", 1)[0])
+
+
 def daily_status_announcement():
     """
     Example: Run daily (via systemd timer or cron) to post status.
@@ -427,20 +931,15 @@ def daily_status_announcement():
     import socket
 
     hostname = socket.gethostname()
-    uptime_seconds = int(open("/proc/uptime").read().split()[0])
-    uptime_hours = uptime_seconds / 3600
 
     publish_announcement(
         "springbrook",
         "Daily Status Report",
-        f"""
-        <p><strong>Observatory Status - {datetime.now().strftime('%Y-%m-%d')}</strong></p>
-        <ul>
-            <li>System: {hostname}</li>
-            <li>Uptime: {uptime_hours:.1f} hours</li>
-            <li>Status: Operational</li>
-        </ul>
-        """,
+        _DAILY_STATUS_TEMPLATE.format(
+            date=time.strftime("%Y-%m-%d"),
+            hostname=hostname,
+            uptime_hours=get_uptime_seconds() / 3600,
+        ),
         announcement_type="info",
         priority=0,
         expires_hours=24,
@@ -462,10 +961,10 @@ def weekly_maintenance_check():
         publish_announcement(
             "springbrook",
             "Maintenance Reminder",
-            f"""
-            <p>Scheduled maintenance in {days_until} days.</p>
-            <p>Date/Time: {next_maintenance.strftime('%Y-%m-%d %H:%M')}</p>
-            """,
+            _MAINTENANCE_REMINDER_TEMPLATE.format(
+                days=days_until,
+                when=next_maintenance.strftime("%Y-%m-%d %H:%M"),
+            ),
             announcement_type="maintenance",
             priority=2,
         )
@@ -480,10 +979,20 @@ def weekly_maintenance_check():
 # Client configuration
 CLIENT_SLUG=springbrook
 
-# Roof monitoring
+# Queue announcements/roof updates and send once per push cycle
+BATCH_MODE=false
+
+# Local cache for announcement dedupe (default: cache.db next to the collector)
+# CACHE_DB_PATH=/home/pi/observatory-collector/cache.db
+
+# Roof monitoring (requires libgpiod v2 Python bindings: pip install gpiod)
 ROOF_MONITORING_ENABLED=true
-ROOF_CHECK_INTERVAL=10  # seconds
+ROOF_HEARTBEAT_INTERVAL=300  # seconds between status re-sends when idle
 
 # Optional: Send roof status via MQTT instead of HTTP
 ROOF_MQTT_TOPIC=roof/status  # If using MQTT topic instead
 """
+
+
+if __name__ == "__main__":
+    main()
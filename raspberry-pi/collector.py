@@ -27,16 +27,38 @@ import json
 import time
 import threading
 import logging
+import ftplib
+import gzip
 import hashlib
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any, Dict, Optional
+import re
+import sched
+import signal
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
 
 import socket
 
 import paho.mqtt.client as mqtt
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    # Optional: orjson parses bytes directly and is much faster than stdlib json
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
 
 # Load environment variables
 load_dotenv()
@@ -46,27 +68,41 @@ load_dotenv()
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def get_device_configs(device_type: str, max_slots: int = 3) -> list:
+_DEVICE_ENV_RE = re.compile(r"^(SQM|DAVIS|CLOUDWATCHER)_(\d+)_(HOST|PORT|INTERVAL)$")
+
+
+def load_device_configs(max_slots: int = 3) -> Dict[str, list]:
     """
-    Get configured devices for a given type.
-    Returns list of dicts with host, port/interval, and slot number.
+    Get configured devices for every type in one pass over the environment.
+    Returns {"SQM": [...], "DAVIS": [...], "CLOUDWATCHER": [...]}, each a list
+    of dicts with host, port/interval, and slot number, ordered by slot.
     Only returns slots where host is configured (non-empty).
     """
-    devices = []
-    for slot in range(1, max_slots + 1):
-        host = os.getenv(f"{device_type}_{slot}_HOST", "")
-        if host:  # Only include if host is configured
-            device = {"host": host, "slot": slot}
-            # Add port for SQM
-            if device_type == "SQM":
-                device["port"] = int(os.getenv(f"{device_type}_{slot}_PORT", "10001"))
-            # Add interval for Davis and Cloudwatcher
-            if device_type in ("DAVIS", "CLOUDWATCHER"):
-                device["interval"] = int(os.getenv(f"{device_type}_{slot}_INTERVAL", "30"))
-            devices.append(device)
+    fields: Dict[tuple, Dict[str, str]] = {}  # (type, slot) -> {"host": ..., ...}
+    for key, value in os.environ.items():
+        match = _DEVICE_ENV_RE.match(key)
+        if match:
+            device_type, slot, field = match.group(1), int(match.group(2)), match.group(3).lower()
+            fields.setdefault((device_type, slot), {})[field] = value
+
+    devices: Dict[str, list] = {"SQM": [], "DAVIS": [], "CLOUDWATCHER": []}
+    for (device_type, slot), values in sorted(fields.items()):
+        host = values.get("host", "")
+        if not host or not 1 <= slot <= max_slots:  # Only include if host is configured
+            continue
+        device = {"host": host, "slot": slot}
+        # Add port for SQM
+        if device_type == "SQM":
+            device["port"] = int(values.get("port", "10001"))
+        # Add interval for Davis and Cloudwatcher
+        else:
+            device["interval"] = int(values.get("interval", "30"))
+        devices[device_type].append(device)
     return devices
 
 
+_DEVICES = load_device_configs()
+
 CONFIG = {
     "remote_api": os.getenv("REMOTE_API_URL", "https://your-site.vercel.app/api/ingest"),
     "api_key": os.getenv("API_KEY", ""),
@@ -75,16 +111,19 @@ CONFIG = {
     "allsky_image_path": os.getenv("ALLSKY_IMAGE_PATH", "/home/pi/allsky/tmp/image.jpg"),
     "allsky_image_url": os.getenv("ALLSKY_IMAGE_URL", ""),  # Fallback URL if file not found
     "push_interval": int(os.getenv("PUSH_INTERVAL", "60")),
+    # Readings that fail to push are spooled here and replayed later (empty disables)
+    "push_spool_path": os.getenv("PUSH_SPOOL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "push-spool.jsonl")),
     "bom_satellite_enabled": os.getenv("BOM_SATELLITE_ENABLED", "true").lower() == "true",
     "bom_satellite_interval": int(os.getenv("BOM_SATELLITE_INTERVAL", "1800")),  # 30 minutes default
     "bom_radar_station": os.getenv("BOM_RADAR_STATION", ""),  # e.g., "71" for Sydney
     "log_level": os.getenv("LOG_LEVEL", "INFO"),
     # Multi-device configurations (up to 3 of each type)
-    "sqm_devices": get_device_configs("SQM"),
-    "davis_devices": get_device_configs("DAVIS"),
-    "cloudwatcher_devices": get_device_configs("CLOUDWATCHER"),
+    "sqm_devices": _DEVICES["SQM"],
+    "davis_devices": _DEVICES["DAVIS"],
+    "cloudwatcher_devices": _DEVICES["CLOUDWATCHER"],
     # Legacy single-device codes for MQTT sources
     "instrument_code_mqtt_weather": os.getenv("INSTRUMENT_CODE_MQTT_WEATHER", "wx-mqtt"),
+    "instrument_code_cloudwatcher": os.getenv("INSTRUMENT_CODE_CLOUDWATCHER", "cw-mqtt"),
     "instrument_code_allsky": os.getenv("INSTRUMENT_CODE_ALLSKY", "allsky-main"),
     # NUT UPS configuration
     "nut_host": os.getenv("NUT_HOST", "localhost"),
@@ -99,6 +138,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger("observatory-collector")
 
+# The level is fixed at startup; hot paths check this before building debug text
+_DEBUG = logger.isEnabledFor(logging.DEBUG)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REMOTE API SESSION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Shared keep-alive session for every call to the remote API (data, images,
+# config, heartbeat, BOM uploads) so they reuse pooled TLS connections.
+# JSON and multipart calls set their own Content-Type.
+api_http = requests.Session()
+api_http.headers["Authorization"] = f"Bearer {CONFIG['api_key']}"
+api_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+api_http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_GZIP_JSON_HEADERS = {**_JSON_HEADERS, "Content-Encoding": "gzip"}
+_JPEG_HEADERS = {"Content-Type": "image/jpeg"}
+
+
+def post_json(url: str, payload: Any, timeout: float, compress: bool = False) -> requests.Response:
+    """
+    POST a JSON body on the API session, encoded with orjson when available.
+    With compress=True the body is gzipped (the endpoint must accept it).
+    """
+    body = _dumps(payload)
+    if compress:
+        # Level 6 gets nearly all of the gain on small JSON at a fraction of level 9's CPU
+        return api_http.post(url, data=gzip.compress(body, compresslevel=6),
+                             headers=_GZIP_JSON_HEADERS, timeout=timeout)
+    return api_http.post(url, data=body, headers=_JSON_HEADERS, timeout=timeout)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # INSTRUMENT HEALTH TRACKER
@@ -106,7 +178,8 @@ logger = logging.getLogger("observatory-collector")
 
 class InstrumentHealthTracker:
     """
-    Tracks success/failure rate for each instrument over a sliding window.
+    Tracks success/failure rate for each instrument as an exponentially
+    weighted moving average (recent readings count most).
 
     Health status thresholds:
     - HEALTHY: < 20% failure rate (default, not explicitly sent)
@@ -115,34 +188,39 @@ class InstrumentHealthTracker:
 
     Requires MIN_READINGS before reporting degraded/offline status.
     This prevents false alarms on startup or after restart.
+
+    Each instrument's state is an immutable (failure weight, total weight)
+    tuple that is replaced on every reading, so no lock is needed: readers
+    always see a consistent pair. Each instrument is written by its own
+    reader thread, so concurrent updates to one code do not occur in practice.
     """
 
-    WINDOW_SIZE = 10  # Track last 10 readings
+    DECAY = 0.9  # Per-reading weight decay (~10-reading memory)
     MIN_READINGS = 3  # Need at least 3 readings before reporting problems
     DEGRADED_THRESHOLD = 0.2  # 20% failures = degraded
     OFFLINE_THRESHOLD = 0.8   # 80% failures = offline
 
+    # Total weight accumulated after MIN_READINGS readings
+    MIN_WEIGHT = (1 - DECAY ** MIN_READINGS) / (1 - DECAY)
+
     def __init__(self):
-        self._history: Dict[str, list] = {}  # code -> list of booleans (True=success)
-        self._lock = threading.Lock()
+        self._ewma: Dict[str, Tuple[float, float]] = {}  # code -> (failure weight, total weight)
+
+    def _record(self, instrument_code: str, success: bool) -> None:
+        """Fold one reading into the instrument's decayed counters."""
+        failures, total = self._ewma.get(instrument_code, (0.0, 0.0))
+        self._ewma[instrument_code] = (
+            failures * self.DECAY + (0.0 if success else 1.0),
+            total * self.DECAY + 1.0,
+        )
 
     def record_success(self, instrument_code: str) -> None:
         """Record a successful reading for an instrument."""
-        with self._lock:
-            if instrument_code not in self._history:
-                self._history[instrument_code] = []
-            self._history[instrument_code].append(True)
-            # Keep only last WINDOW_SIZE readings
-            self._history[instrument_code] = self._history[instrument_code][-self.WINDOW_SIZE:]
+        self._record(instrument_code, True)
 
     def record_failure(self, instrument_code: str) -> None:
         """Record a failed reading for an instrument."""
-        with self._lock:
-            if instrument_code not in self._history:
-                self._history[instrument_code] = []
-            self._history[instrument_code].append(False)
-            # Keep only last WINDOW_SIZE readings
-            self._history[instrument_code] = self._history[instrument_code][-self.WINDOW_SIZE:]
+        self._record(instrument_code, False)
 
     def get_status(self, instrument_code: str) -> str:
         """
@@ -152,36 +230,48 @@ class InstrumentHealthTracker:
         Requires MIN_READINGS before reporting problems - this gives
         instruments time to establish a pattern after startup.
         """
-        with self._lock:
-            history = self._history.get(instrument_code, [])
+        return self._classify(*self._ewma.get(instrument_code, (0.0, 0.0)))
 
-            # Not enough data yet - assume healthy (grace period)
-            if len(history) < self.MIN_READINGS:
-                return "HEALTHY"
+    def _classify(self, failures: float, total: float) -> str:
+        """Map one (failure weight, total weight) pair to a health status."""
+        # Not enough data yet - assume healthy (grace period)
+        if total < self.MIN_WEIGHT - 1e-9:
+            return "HEALTHY"
 
-            failure_count = sum(1 for success in history if not success)
-            failure_rate = failure_count / len(history)
+        failure_rate = failures / total
 
-            if failure_rate >= self.OFFLINE_THRESHOLD:
-                return "OFFLINE"
-            elif failure_rate >= self.DEGRADED_THRESHOLD:
-                return "DEGRADED"
-            else:
-                return "HEALTHY"
+        if failure_rate >= self.OFFLINE_THRESHOLD:
+            return "OFFLINE"
+        elif failure_rate >= self.DEGRADED_THRESHOLD:
+            return "DEGRADED"
+        else:
+            return "HEALTHY"
 
     def get_all_statuses(self) -> Dict[str, str]:
         """Get health status for all tracked instruments."""
-        with self._lock:
-            return {code: self.get_status(code) for code in self._history.keys()}
+        return {code: self.get_status(code) for code in list(self._ewma)}
 
     def get_failure_rate(self, instrument_code: str) -> float:
         """Get failure rate for an instrument (0.0 to 1.0)."""
-        with self._lock:
-            history = self._history.get(instrument_code, [])
-            if not history:
-                return 0.0
-            failure_count = sum(1 for success in history if not success)
-            return failure_count / len(history)
+        failures, total = self._ewma.get(instrument_code, (0.0, 0.0))
+        if not total:
+            return 0.0
+        return failures / total
+
+    def snapshot(self, codes) -> Dict[str, Dict[str, Any]]:
+        """
+        Get status and failure rate for each code in one pass.
+        Both values come from the same (failures, total) pair per instrument.
+        """
+        ewma = self._ewma
+        health = {}
+        for code in codes:
+            failures, total = ewma.get(code, (0.0, 0.0))
+            health[code] = {
+                "status": self._classify(failures, total),
+                "failure_rate": failures / total if total else 0.0,
+            }
+        return health
 
 
 # Global health tracker
@@ -192,64 +282,186 @@ health_tracker = InstrumentHealthTracker()
 # MULTI-INSTRUMENT DATA STORE
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _fmt_ts(ns: int) -> str:
+    """Format a time.time_ns() value as a naive UTC ISO string (utcnow() style)."""
+    seconds, nanos = divmod(ns, 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{nanos // 1000:06d}"
+
+
 class MultiInstrumentDataStore:
-    """Thread-safe store for multiple instrument readings."""
+    """
+    Thread-safe store for multiple instrument readings.
+
+    Copy-on-write: each instrument's readings dict is never mutated after it
+    is stored. Writers build a new dict and swap it in under that
+    instrument's own lock, so writers for different instruments never wait
+    on each other; readers take the current references without locking.
+    Dicts returned by get()/get_all() must be treated as read-only.
+
+    Each instrument's last update time is kept as raw nanoseconds under
+    "_ts_ns" and only formatted when a caller needs a string.
+    """
 
     def __init__(self):
         self._instruments: Dict[str, Dict[str, Any]] = {}
-        self._lock = threading.Lock()
+        # Per-instrument writer locks. threading.Lock is a C factory, so the
+        # defaultdict insert runs without releasing the GIL and cannot race.
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        # code -> (readings dict the payload was built from, push payload)
+        self._payloads: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        # code -> {"code", "type", "host", "slot"} for the config push
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        # Set when a reading turns urgent; wakes the data pusher early
+        self.urgent = threading.Event()
+
+    # Conditions worth pushing immediately rather than at the next interval
+    URGENT_CONDITIONS = {
+        "rain_condition": frozenset({"Rain", "Wet"}),
+        "cloud_condition": frozenset({"VeryCloudy"}),
+        "wind_condition": frozenset({"VeryWindy"}),
+    }
+    _URGENT_KEYS = frozenset(URGENT_CONDITIONS)
+
+    def register(self, instrument_code: str, inst_type: str, host: str = "auto-detected", slot: int = 0) -> None:
+        """Record an instrument's type and origin once its code is known."""
+        self._meta[instrument_code] = {
+            "code": instrument_code,
+            "type": inst_type,
+            "host": host,
+            "slot": slot,
+        }
+
+    def get_meta(self, instrument_code: str) -> Dict[str, Any]:
+        """
+        Get an instrument's registration (read-only). Instruments that were
+        never registered (e.g. MQTT sources) are classified by code prefix
+        once and cached.
+        """
+        meta = self._meta.get(instrument_code)
+        if meta is None:
+            if instrument_code.startswith("sqm-"):
+                inst_type = "sqm"
+            elif instrument_code.startswith("davis-"):
+                inst_type = "weather_station"
+            elif instrument_code.startswith("cw-"):
+                inst_type = "cloudwatcher"
+            else:
+                inst_type = "unknown"
+            self.register(instrument_code, inst_type)
+            meta = self._meta[instrument_code]
+        return meta
 
     def update(self, instrument_code: str, **kwargs) -> None:
         """Update readings for a specific instrument."""
-        with self._lock:
-            if instrument_code not in self._instruments:
-                self._instruments[instrument_code] = {}
-            self._instruments[instrument_code].update(kwargs)
-            self._instruments[instrument_code]["timestamp"] = datetime.utcnow().isoformat()
+        ts_ns = time.time_ns()
+        with self._locks[instrument_code]:
+            old = self._instruments.get(instrument_code, {})
+            self._instruments[instrument_code] = {**old, **kwargs, "_ts_ns": ts_ns}
+
+        for key in self._URGENT_KEYS.intersection(kwargs):
+            value = kwargs[key]
+            if value != old.get(key) and value in self.URGENT_CONDITIONS[key]:
+                self.urgent.set()
+
+    def update_lora_sensor(self, instrument_code: str, sensor_id: str, payload: dict) -> None:
+        """Record one LoRa sensor reading under an instrument's lora_sensors."""
+        ts_ns = time.time_ns()
+        with self._locks[instrument_code]:
+            old = self._instruments.get(instrument_code, {})
+            lora_sensors = {
+                **old.get("lora_sensors", {}),
+                sensor_id: {**payload, "last_update": ts_ns},  # Formatted in get_payload()
+            }
+            self._instruments[instrument_code] = {**old, "lora_sensors": lora_sensors, "_ts_ns": ts_ns}
 
     def get(self, instrument_code: str) -> Dict[str, Any]:
-        """Get readings for a specific instrument."""
-        with self._lock:
-            return self._instruments.get(instrument_code, {}).copy()
+        """Get readings for a specific instrument (read-only)."""
+        return self._instruments.get(instrument_code, {})
 
     def get_all(self) -> Dict[str, Dict[str, Any]]:
-        """Get all instrument readings."""
-        with self._lock:
-            return {k: v.copy() for k, v in self._instruments.items()}
+        """Get all instrument readings (snapshot; inner dicts are read-only)."""
+        # dict() copies atomically under the GIL, so a concurrent insert
+        # cannot break iteration over the snapshot
+        return dict(self._instruments)
 
-    def get_combined(self) -> Dict[str, Any]:
-        """Get combined readings from all instruments (legacy format)."""
-        with self._lock:
-            combined = {
-                "timestamp": None,
-                "temperature": None,
-                "humidity": None,
-                "pressure": None,
-                "dewpoint": None,
-                "wind_speed": None,
-                "wind_gust": None,
-                "wind_direction": None,
-                "rain_rate": None,
-                "cloud_condition": "Unknown",
-                "rain_condition": "Unknown",
-                "wind_condition": "Unknown",
-                "day_condition": "Unknown",
-                "sky_temp": None,
-                "ambient_temp": None,
-                "sky_quality": None,
-                "sqm_temperature": None,
-                "lora_sensors": {},
-            }
+    def get_payload(self, instrument_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the ready-to-push payload for an instrument (read-only), or None
+        if it has no readings. Built once per update: readings dicts are
+        replaced on every write, so the cached payload stays valid for as
+        long as the dict it was built from is current.
+        """
+        timed = self.get_timed_payload(instrument_code)
+        return timed[0] if timed else None
+
+    def get_timed_payload(self, instrument_code: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Like get_payload(), but paired with the time.time_ns() of the update
+        the payload was built from, or None if there are no readings.
+        """
+        data = self._instruments.get(instrument_code)
+        if not data:
+            return None
 
-            # Merge all instrument data (later values overwrite earlier)
-            for instrument_data in self._instruments.values():
-                for key, value in instrument_data.items():
-                    if key == "lora_sensors" and isinstance(value, dict):
-                        combined["lora_sensors"].update(value)
-                    elif value is not None and key in combined:
-                        combined[key] = value
+        cached = self._payloads.get(instrument_code)
+        if cached is not None and cached[0] is data:
+            return cached[1], data["_ts_ns"]
+
+        payload = {
+            "instrument_code": instrument_code,
+            **{k: v for k, v in data.items() if k != "_ts_ns"}
+        }
+        if "lora_sensors" in payload:
+            payload["lora_sensors"] = {
+                sensor_id: {**sensor, "last_update": _fmt_ts(sensor["last_update"])}
+                for sensor_id, sensor in payload["lora_sensors"].items()
+            }
+        self._payloads[instrument_code] = (data, payload)
+        return payload, data["_ts_ns"]
+
+    # Legacy combined format: every key with its "no data" default
+    _COMBINED_TEMPLATE = {
+        "timestamp": None,
+        "temperature": None,
+        "humidity": None,
+        "pressure": None,
+        "dewpoint": None,
+        "wind_speed": None,
+        "wind_gust": None,
+        "wind_direction": None,
+        "rain_rate": None,
+        "cloud_condition": "Unknown",
+        "rain_condition": "Unknown",
+        "wind_condition": "Unknown",
+        "day_condition": "Unknown",
+        "sky_temp": None,
+        "ambient_temp": None,
+        "sky_quality": None,
+        "sqm_temperature": None,
+        "lora_sensors": {},
+    }
+    _COMBINED_KEYS = frozenset(_COMBINED_TEMPLATE) - {"timestamp", "lora_sensors"}
 
-            return combined
+    def get_combined(self) -> Dict[str, Any]:
+        """Get combined readings from all instruments (legacy format)."""
+        combined = dict(self._COMBINED_TEMPLATE)
+        combined["lora_sensors"] = {}
+        latest_ns = 0
+
+        # Merge all instrument data (later values overwrite earlier)
+        for instrument_data in self.get_all().values():
+            latest_ns = max(latest_ns, instrument_data.get("_ts_ns", 0))
+            for key in self._COMBINED_KEYS.intersection(instrument_data):
+                value = instrument_data[key]
+                if value is not None:
+                    combined[key] = value
+            lora = instrument_data.get("lora_sensors")
+            if lora:
+                combined["lora_sensors"].update(lora)
+
+        if latest_ns:
+            combined["timestamp"] = _fmt_ts(latest_ns)
+        return combined
 
 
 # Global data store
@@ -260,129 +472,172 @@ data_store = MultiInstrumentDataStore()
 # MQTT HANDLER (Davis via weewx, LoRa sensors)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def on_mqtt_connect(client, userdata, flags, rc):
+def on_mqtt_connect(client, userdata, flags, rc, properties=None):
+    # rc is an int (paho 1.x) or a ReasonCode that compares equal to one (2.x)
     if rc == 0:
         logger.info("Connected to MQTT broker")
-        client.subscribe("weather/#")
-        client.subscribe("weewx/#")
-        client.subscribe("lora/#")
-        client.subscribe("cloudwatcher/#")
-        client.subscribe("aag/#")
+        # Weather packets are small; don't let Nagle hold them back
+        sock = client.socket()
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # One SUBSCRIBE for every filter, QoS 0 (latest reading wins anyway)
+        client.subscribe([(topic_filter, 0) for topic_filter, _ in _MQTT_SUBSCRIPTIONS])
     else:
         logger.error(f"MQTT connection failed with code {rc}")
 
 
-def on_mqtt_message(client, userdata, msg):
-    try:
-        topic = msg.topic
-        payload = json.loads(msg.payload.decode())
-        logger.debug(f"MQTT: {topic} -> {payload}")
-
-        if "weewx" in topic or "weather" in topic:
-            instrument_code = CONFIG["instrument_code_mqtt_weather"]
-            updates = {}
-            field_map = {
-                "outTemp": "temperature",
-                "outHumidity": "humidity",
-                "barometer": "pressure",
-                "dewpoint": "dewpoint",
-                "windSpeed": "wind_speed",
-                "windGust": "wind_gust",
-                "windDir": "wind_direction",
-                "rainRate": "rain_rate",
-            }
+# weewx field -> our field
+_WEATHER_FIELDS = {
+    "outTemp": "temperature",
+    "outHumidity": "humidity",
+    "barometer": "pressure",
+    "dewpoint": "dewpoint",
+    "windSpeed": "wind_speed",
+    "windGust": "wind_gust",
+    "windDir": "wind_direction",
+    "rainRate": "rain_rate",
+}
+_WEATHER_KEYS = frozenset(_WEATHER_FIELDS)
+# weewx fields that are temperatures and may need F->C
+_WEATHER_TEMP_FIELDS = frozenset({"outTemp", "dewpoint"})
+
+
+def _handle_weather_message(topic: str, payload: dict) -> None:
+    """Davis weather via weewx (weather/# and weewx/# topics)."""
+    updates = {}
+    # Set intersection walks only the mapped fields this packet carries
+    for mqtt_field in payload.keys() & _WEATHER_KEYS:
+        value = payload[mqtt_field]
+        if value is None:
+            continue
+        # Convert F to C if needed
+        if mqtt_field in _WEATHER_TEMP_FIELDS and value > 50:
+            value = (value - 32) * 5 / 9
+        updates[_WEATHER_FIELDS[mqtt_field]] = value
+
+    if updates:
+        data_store.update(CONFIG["instrument_code_mqtt_weather"], **updates)
+
+
+def _handle_lora_message(topic: str, payload: dict) -> None:
+    """LoRa sensors (lora/# topics), stored under the MQTT weather instrument."""
+    sensor_id = payload.get("id", topic.split("/")[-1])
+    data_store.update_lora_sensor(CONFIG["instrument_code_mqtt_weather"], sensor_id, payload)
+
+
+def _handle_cloudwatcher_message(topic: str, payload: dict) -> None:
+    """AAG Cloudwatcher (cloudwatcher/# and aag/# topics)."""
+    instrument_code = CONFIG["instrument_code_cloudwatcher"]
+    updates = {}
+    get = payload.get
+
+    # Sky and ambient temperature (cast once, reused for classification)
+    sky_temp = get("clouds")
+    ambient_temp = get("temp")
+
+    if sky_temp is not None:
+        sky_temp = updates["sky_temp"] = float(sky_temp)
+    if ambient_temp is not None:
+        ambient_temp = updates["ambient_temp"] = float(ambient_temp)
+
+    # Cloud condition
+    clouds_safe = get("cloudsSafe", "")
+    if clouds_safe:
+        updates["cloud_condition"] = "Clear" if clouds_safe == "Safe" else "Cloudy"
+    elif sky_temp is not None and ambient_temp is not None:
+        updates["cloud_condition"] = classify_cloud_condition(sky_temp, ambient_temp)
+
+    # Rain condition
+    rain_safe = get("rainSafe", "")
+    rain_val = get("rain")
+    if rain_safe:
+        updates["rain_condition"] = "Dry" if rain_safe == "Safe" else "Rain"
+    elif rain_val is not None:
+        updates["rain_condition"] = classify_rain_condition(int(rain_val))
+
+    # Light/day condition
+    light_safe = get("lightSafe", "")
+    light_mpsas = get("lightmpsas")
+    if light_safe:
+        updates["day_condition"] = "Dark" if light_safe == "Safe" else "Light"
+    elif light_mpsas is not None:
+        if light_mpsas > 18:
+            updates["day_condition"] = "Dark"
+        elif light_mpsas > 10:
+            updates["day_condition"] = "Light"
+        else:
+            updates["day_condition"] = "VeryLight"
+
+    # Wind condition
+    wind_safe = get("windSafe", "")
+    wind_val = get("wind")
+    if wind_safe:
+        updates["wind_condition"] = "Calm" if wind_safe == "Safe" else "Windy"
+    elif wind_val is not None:
+        updates["wind_condition"] = classify_wind_condition(float(wind_val))
+
+    if updates:
+        logger.info(f"Cloudwatcher MQTT [{instrument_code}]: {updates}")
+        data_store.update(instrument_code, **updates)
+
+
+# Topic filter -> handler; paho routes each message to its match
+_MQTT_SUBSCRIPTIONS = (
+    ("weather/#", _handle_weather_message),
+    ("weewx/#", _handle_weather_message),
+    ("lora/#", _handle_lora_message),
+    ("cloudwatcher/#", _handle_cloudwatcher_message),
+    ("aag/#", _handle_cloudwatcher_message),
+)
 
-            for mqtt_field, our_field in field_map.items():
-                if mqtt_field in payload:
-                    value = payload[mqtt_field]
-                    # Convert F to C if needed
-                    if "Temp" in mqtt_field or mqtt_field == "dewpoint":
-                        if value is not None and value > 50:
-                            value = (value - 32) * 5 / 9
-                    updates[our_field] = value
 
-            if updates:
-                data_store.update(instrument_code, **updates)
+def _mqtt_callback(handler):
+    """Wrap a (topic, payload) handler as a paho per-topic message callback."""
+    def on_message(client, userdata, msg):
+        try:
+            payload = _loads(msg.payload)
+            if _DEBUG:
+                logger.debug("MQTT: %s -> %s", msg.topic, payload)
+            handler(msg.topic, payload)
 
-        elif "lora" in topic:
-            # LoRa sensors are stored under the MQTT weather instrument
-            sensor_id = payload.get("id", topic.split("/")[-1])
-            current = data_store.get(CONFIG["instrument_code_mqtt_weather"])
-            lora_sensors = current.get("lora_sensors", {})
-            lora_sensors[sensor_id] = {
-                **payload,
-                "last_update": datetime.utcnow().isoformat(),
-            }
-            data_store.update(CONFIG["instrument_code_mqtt_weather"], lora_sensors=lora_sensors)
+        except _JSONDecodeError:
+            logger.warning(f"Invalid JSON on topic {msg.topic}")
+        except Exception as e:
+            logger.error(f"MQTT message handling error: {e}")
 
-        elif "cloudwatcher" in topic or "aag" in topic:
-            instrument_code = CONFIG["instrument_code_cloudwatcher"]
-            updates = {}
+    return on_message
 
-            # Sky and ambient temperature
-            sky_temp = payload.get("clouds")
-            ambient_temp = payload.get("temp")
-
-            if sky_temp is not None:
-                updates["sky_temp"] = float(sky_temp)
-            if ambient_temp is not None:
-                updates["ambient_temp"] = float(ambient_temp)
-
-            # Cloud condition
-            clouds_safe = payload.get("cloudsSafe", "")
-            if clouds_safe:
-                if clouds_safe == "Safe":
-                    updates["cloud_condition"] = "Clear"
-                else:
-                    updates["cloud_condition"] = "Cloudy"
-            elif sky_temp is not None and ambient_temp is not None:
-                updates["cloud_condition"] = classify_cloud_condition(float(sky_temp), float(ambient_temp))
-
-            # Rain condition
-            rain_safe = payload.get("rainSafe", "")
-            rain_val = payload.get("rain")
-            if rain_safe:
-                updates["rain_condition"] = "Dry" if rain_safe == "Safe" else "Rain"
-            elif rain_val is not None:
-                updates["rain_condition"] = classify_rain_condition(int(rain_val))
-
-            # Light/day condition
-            light_safe = payload.get("lightSafe", "")
-            light_mpsas = payload.get("lightmpsas")
-            if light_safe:
-                updates["day_condition"] = "Dark" if light_safe == "Safe" else "Light"
-            elif light_mpsas is not None:
-                if light_mpsas > 18:
-                    updates["day_condition"] = "Dark"
-                elif light_mpsas > 10:
-                    updates["day_condition"] = "Light"
-                else:
-                    updates["day_condition"] = "VeryLight"
 
-            # Wind condition
-            wind_safe = payload.get("windSafe", "")
-            wind_val = payload.get("wind")
-            if wind_safe:
-                updates["wind_condition"] = "Calm" if wind_safe == "Safe" else "Windy"
-            elif wind_val is not None:
-                updates["wind_condition"] = classify_wind_condition(float(wind_val))
+def on_mqtt_message(client, userdata, msg):
+    """Fallback for messages that match none of _MQTT_SUBSCRIPTIONS."""
+    if _DEBUG:
+        logger.debug("MQTT: ignoring message on unhandled topic %s", msg.topic)
 
-            if updates:
-                logger.info(f"Cloudwatcher MQTT [{instrument_code}]: {updates}")
-                data_store.update(instrument_code, **updates)
 
-    except json.JSONDecodeError:
-        logger.warning(f"Invalid JSON on topic {msg.topic}")
-    except Exception as e:
-        logger.error(f"MQTT message handling error: {e}")
+def _new_mqtt_client() -> mqtt.Client:
+    """
+    Create the MQTT client with a stable client ID and a persistent session,
+    so the broker keeps our subscriptions across reconnects.
+    """
+    client_id = f"observatory-{get_collector_id()}"
+    if hasattr(mqtt, "CallbackAPIVersion"):  # paho-mqtt >= 2.0
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id,
+                           clean_session=False, transport="tcp")
+    return mqtt.Client(client_id=client_id, clean_session=False, transport="tcp")
 
 
 def start_mqtt() -> Optional[mqtt.Client]:
     try:
-        client = mqtt.Client()
+        client = _new_mqtt_client()
         client.on_connect = on_mqtt_connect
         client.on_message = on_mqtt_message
-        client.connect(CONFIG["mqtt_broker"], CONFIG["mqtt_port"], 60)
+        for topic_filter, handler in _MQTT_SUBSCRIPTIONS:
+            client.message_callback_add(topic_filter, _mqtt_callback(handler))
+        # Back off 1s..60s between reconnects (paho's default ceiling is 120s)
+        client.reconnect_delay_set(min_delay=1, max_delay=60)
+        # connect_async() lets the network loop keep retrying if the broker
+        # is not up yet at boot, instead of giving up on MQTT for good
+        client.connect_async(CONFIG["mqtt_broker"], CONFIG["mqtt_port"], 60)
         client.loop_start()
         logger.info(f"MQTT client started, connecting to {CONFIG['mqtt_broker']}")
         return client
@@ -395,66 +650,58 @@ def start_mqtt() -> Optional[mqtt.Client]:
 # CLOUDWATCHER READER
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Ascending thresholds and the label for each band (len(labels) == len(thresholds) + 1).
+# bisect_right puts a value equal to a threshold in the band above it ("<" ladders);
+# bisect_left puts it in the band below (">" ladders).
+_CLOUD_THRESHOLDS = (-25, -15)  # sky - ambient delta
+_CLOUD_LABELS = ("Clear", "Cloudy", "VeryCloudy")
+_WIND_THRESHOLDS = (10, 30)
+_WIND_LABELS = ("Calm", "Windy", "VeryWindy")
+_RAIN_THRESHOLDS = (1500, 2500)
+_RAIN_LABELS = ("Rain", "Wet", "Dry")
+_DAY_THRESHOLDS = (10, 1000)
+_DAY_LABELS = ("Dark", "Light", "VeryLight")
+
+
 def classify_cloud_condition(sky_temp: float, ambient_temp: float) -> str:
-    delta = sky_temp - ambient_temp
-    if delta < -25:
-        return "Clear"
-    elif delta < -15:
-        return "Cloudy"
-    else:
-        return "VeryCloudy"
+    return _CLOUD_LABELS[bisect_right(_CLOUD_THRESHOLDS, sky_temp - ambient_temp)]
 
 
 def classify_wind_condition(wind_speed: Optional[float]) -> str:
     if wind_speed is None:
         return "Unknown"
-    if wind_speed < 10:
-        return "Calm"
-    elif wind_speed < 30:
-        return "Windy"
-    else:
-        return "VeryWindy"
+    return _WIND_LABELS[bisect_right(_WIND_THRESHOLDS, wind_speed)]
 
 
 def classify_rain_condition(rain_sensor: int) -> str:
-    if rain_sensor > 2500:
-        return "Dry"
-    elif rain_sensor > 1500:
-        return "Wet"
-    else:
-        return "Rain"
+    return _RAIN_LABELS[bisect_left(_RAIN_THRESHOLDS, rain_sensor)]
 
 
 def classify_day_condition(light_sensor: int) -> str:
-    if light_sensor < 10:
-        return "Dark"
-    elif light_sensor < 1000:
-        return "Light"
-    else:
-        return "VeryLight"
+    return _DAY_LABELS[bisect_right(_DAY_THRESHOLDS, light_sensor)]
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SQM READER (Multi-device support)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def get_sqm_serial(sock) -> Optional[str]:
+def get_sqm_serial(sock: socket.socket, fp) -> Optional[str]:
     """
     Query SQM unit information to get serial number.
     Command 'ix' returns unit info including serial number.
     Response format: i,00000002,00000003,00000001,00000413
     The 5th field (index 4) is the serial number.
+
+    fp is the connection's buffered reader from sock.makefile("rb").
     """
     try:
+        # No fixed pause: readline() blocks (up to the socket timeout) until
+        # the unit replies, so waiting first only adds latency
         sock.sendall(b"ix")
-        time.sleep(0.5)
 
-        response = b""
-        while not response.endswith(b"\n"):
-            chunk = sock.recv(256)
-            if not chunk:
-                return None
-            response += chunk
+        response = fp.readline()
+        if not response:
+            return None
 
         response_str = response.decode("ascii", errors="ignore").strip()
 
@@ -469,39 +716,32 @@ def get_sqm_serial(sock) -> Optional[str]:
     return None
 
 
-def read_sqm_single(sock: socket.socket, timeout: float = 10.0) -> Optional[tuple]:
+# "rx" reply, e.g. b"r, 06.70m,0000022921Hz,0000000020c,0000000.000s, 039.4C\r\n":
+# magnitude in the first field, sensor temperature in the last field ending in C
+_SQM_READING = re.compile(rb"r,\s*(-?\d+(?:\.\d*)?)m?(?:,.*,\s*(-?\d+(?:\.\d*)?)C)?")
+
+
+def read_sqm_single(sock: socket.socket, fp, timeout: float = 10.0) -> Optional[tuple]:
     """
     Perform a single SQM reading.
     Returns (sqm_value, sqm_temp) on success, None on invalid response.
     Raises socket errors on connection issues.
+
+    fp is the connection's buffered reader from sock.makefile("rb").
     """
     sock.sendall(b"rx")
-    time.sleep(0.5)
-
-    response = b""
-    while not response.endswith(b"\n"):
-        chunk = sock.recv(256)
-        if not chunk:
-            raise ConnectionError("Connection closed")
-        response += chunk
-
-    response_str = response.decode("ascii", errors="ignore").strip()
-
-    if response_str.startswith("r,"):
-        parts = response_str.split(",")
-        if len(parts) >= 2:
-            mag_str = parts[1].strip()
-            sqm_value = float(mag_str.replace("m", "").strip())
 
-            sqm_temp = None
-            if len(parts) >= 5:
-                temp_str = parts[4].strip()
-                if temp_str.endswith("C"):
-                    sqm_temp = float(temp_str.replace("C", "").strip())
+    response = fp.readline()
+    if not response:
+        raise ConnectionError("Connection closed")
 
-            return (sqm_value, sqm_temp)
+    match = _SQM_READING.match(response.lstrip())
+    if match:
+        mag, temp = match.groups()
+        return (float(mag), float(temp) if temp is not None else None)
 
-    logger.debug(f"SQM invalid response: {response_str[:50]}")
+    if _DEBUG:
+        logger.debug("SQM invalid response: %s", response[:50].decode("ascii", errors="ignore").strip())
     return None
 
 
@@ -526,40 +766,45 @@ def read_sqm_device(device_config: dict):
             try:
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                     sock.settimeout(10)
+                    # Commands are tiny request/response writes; don't let Nagle hold them
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                     sock.connect((host, port))
-
-                    if attempt == 0:
-                        logger.debug(f"Connected to SQM-LE at {host}:{port}")
-
-                    # Try to get serial number on first successful connection
-                    if not serial_obtained:
-                        serial = get_sqm_serial(sock)
-                        if serial:
-                            instrument_code = f"sqm-{serial}"
-                            serial_obtained = True
-                            logger.info(f"SQM at {host} identified as serial {serial}, code: {instrument_code}")
+                    # Buffered line reads replace the manual recv/concat loop
+                    with sock.makefile("rb", buffering=4096) as fp:
+                        if attempt == 0:
+                            logger.debug(f"Connected to SQM-LE at {host}:{port}")
+
+                        # Try to get serial number on first successful connection
+                        if not serial_obtained:
+                            serial = get_sqm_serial(sock, fp)
+                            if serial:
+                                instrument_code = f"sqm-{serial}"
+                                serial_obtained = True
+                                logger.info(f"SQM at {host} identified as serial {serial}, code: {instrument_code}")
+                            else:
+                                logger.info(f"SQM at {host} using IP-based code: {instrument_code}")
+                            data_store.register(instrument_code, "sqm", host, slot)
+
+                        # Attempt single read
+                        result = read_sqm_single(sock, fp)
+
+                        if result:
+                            sqm_value, sqm_temp = result
+                            data_store.update(
+                                instrument_code,
+                                sky_quality=sqm_value,
+                                sqm_temperature=sqm_temp,
+                            )
+                            health_tracker.record_success(instrument_code)
+                            if _DEBUG:
+                                logger.debug("SQM [%s]: %s mag/arcsec², temp=%s°C", instrument_code, sqm_value, sqm_temp)
+                            success = True
+                            break  # Success - exit retry loop
                         else:
-                            logger.info(f"SQM at {host} using IP-based code: {instrument_code}")
-
-                    # Attempt single read
-                    result = read_sqm_single(sock)
-
-                    if result:
-                        sqm_value, sqm_temp = result
-                        data_store.update(
-                            instrument_code,
-                            sky_quality=sqm_value,
-                            sqm_temperature=sqm_temp,
-                        )
-                        health_tracker.record_success(instrument_code)
-                        logger.debug(f"SQM [{instrument_code}]: {sqm_value} mag/arcsec², temp={sqm_temp}°C")
-                        success = True
-                        break  # Success - exit retry loop
-                    else:
-                        # Invalid response - retry with new connection
-                        if attempt < max_retries - 1:
-                            logger.debug(f"SQM {host} retry {attempt + 1}/{max_retries}: invalid response")
-                            time.sleep(retry_delay)
+                            # Invalid response - retry with new connection
+                            if attempt < max_retries - 1:
+                                logger.debug(f"SQM {host} retry {attempt + 1}/{max_retries}: invalid response")
+                                time.sleep(retry_delay)
 
             except (socket.error, ConnectionError, OSError) as e:
                 if attempt < max_retries - 1:
@@ -586,14 +831,38 @@ def read_sqm_device(device_config: dict):
 # WEATHERLINK LIVE READER (Multi-device support)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def fahrenheit_to_celsius(f: float) -> float:
-    """Convert Fahrenheit to Celsius."""
-    return (f - 32) * 5 / 9
+# Shared keep-alive session for LAN device polling (WeatherLink, Cloudwatcher).
+# Pools one connection per host so each poll skips DNS and the TCP handshake.
+device_http = requests.Session()
+device_http.mount("http://", HTTPAdapter(pool_connections=6, pool_maxsize=6, max_retries=0))
+
+
+MPH_TO_KMH = 1.60934
+HPA_PER_INHG = 33.8639
+RAIN_MM_PER_COUNT = 0.2  # Metric rain collector: 0.2mm per bucket tip
 
 
 def inches_to_hpa(inches: float) -> float:
     """Convert inches of mercury to hectopascals."""
-    return inches * 33.8639
+    return inches * HPA_PER_INHG
+
+
+# F->C as one multiply-add: C = F * 5/9 - 32 * 5/9
+_F_TO_C_SCALE = 5 / 9
+_F_TO_C_OFFSET = -32 * 5 / 9
+
+# ISS (data_structure_type 1) field -> (our field, scale, offset, decimals);
+# decimals None copies the value as-is
+_ISS_FIELDS = (
+    ("temp", "temperature", _F_TO_C_SCALE, _F_TO_C_OFFSET, 1),
+    ("hum", "humidity", 1.0, 0.0, None),
+    ("dew_point", "dewpoint", _F_TO_C_SCALE, _F_TO_C_OFFSET, 1),
+    ("wind_speed_last", "wind_speed", MPH_TO_KMH, 0.0, 1),
+    ("wind_dir_last", "wind_direction", 1.0, 0.0, None),
+    ("wind_speed_hi_last_10_min", "wind_gust", MPH_TO_KMH, 0.0, 1),
+    # rain_rate_last is in counts/hour
+    ("rain_rate_last", "rain_rate", RAIN_MM_PER_COUNT, 0.0, 2),
+)
 
 
 def get_weatherlink_lsid(host: str) -> Optional[str]:
@@ -603,9 +872,9 @@ def get_weatherlink_lsid(host: str) -> Optional[str]:
     """
     try:
         url = f"http://{host}/v1/current_conditions"
-        response = requests.get(url, timeout=10)
+        response = device_http.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = _loads(response.content)
 
         conditions = data.get("data", {}).get("conditions", [])
         for condition in conditions:
@@ -635,9 +904,9 @@ def read_weatherlink_device(device_config: dict):
 
     while True:
         try:
-            response = requests.get(url, timeout=10)
+            response = device_http.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
 
             if data.get("error"):
                 logger.warning(f"WeatherLink API error: {data['error']}")
@@ -659,6 +928,7 @@ def read_weatherlink_device(device_config: dict):
                 if not lsid_obtained:
                     logger.info(f"WeatherLink at {host} using IP-based code: {instrument_code}")
                     lsid_obtained = True  # Don't keep trying
+                data_store.register(instrument_code, "weather_station", host, slot)
 
             updates = {}
 
@@ -667,22 +937,10 @@ def read_weatherlink_device(device_config: dict):
 
                 # Type 1 = ISS (Integrated Sensor Suite) - outdoor sensors
                 if data_type == 1:
-                    if condition.get("temp") is not None:
-                        updates["temperature"] = round(fahrenheit_to_celsius(condition["temp"]), 1)
-                    if condition.get("hum") is not None:
-                        updates["humidity"] = condition["hum"]
-                    if condition.get("dew_point") is not None:
-                        updates["dewpoint"] = round(fahrenheit_to_celsius(condition["dew_point"]), 1)
-                    if condition.get("wind_speed_last") is not None:
-                        # Convert mph to km/h
-                        updates["wind_speed"] = round(condition["wind_speed_last"] * 1.60934, 1)
-                    if condition.get("wind_dir_last") is not None:
-                        updates["wind_direction"] = condition["wind_dir_last"]
-                    if condition.get("wind_speed_hi_last_10_min") is not None:
-                        updates["wind_gust"] = round(condition["wind_speed_hi_last_10_min"] * 1.60934, 1)
-                    if condition.get("rain_rate_last") is not None:
-                        # rain_rate_last is in counts/hour, convert to mm/hr (0.2mm per count for metric)
-                        updates["rain_rate"] = round(condition["rain_rate_last"] * 0.2, 2)
+                    for wl_field, our_field, scale, offset, decimals in _ISS_FIELDS:
+                        value = condition.get(wl_field)
+                        if value is not None:
+                            updates[our_field] = value if decimals is None else round(value * scale + offset, decimals)
 
                 # Type 3 = Barometer
                 elif data_type == 3:
@@ -712,6 +970,10 @@ def read_weatherlink_device(device_config: dict):
 # CLOUDWATCHER CGI READER (Multi-device support)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# One "key=value" line of a Cloudwatcher CGI body (key and value trimmed)
+_CW_LINE = re.compile(rb"^[ \t]*([^=\r\n]+?)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.M)
+
+
 def get_cloudwatcher_serial(host: str) -> Optional[str]:
     """
     Query Cloudwatcher debug endpoint to get serial number.
@@ -719,18 +981,13 @@ def get_cloudwatcher_serial(host: str) -> Optional[str]:
     """
     try:
         url = f"http://{host}/cgi-bin/cgiDebugData"
-        response = requests.get(url, timeout=10)
+        response = device_http.get(url, timeout=10)
         response.raise_for_status()
 
-        # Parse key=value format
-        for line in response.text.strip().split("\n"):
-            if "=" in line:
-                key, value = line.split("=", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                # Look for "serial num" or similar keys
-                if "serial" in key:
-                    return value
+        # Parse key=value format, looking for "serial num" or similar keys
+        for match in _CW_LINE.finditer(response.content):
+            if b"serial" in match.group(1).lower():
+                return match.group(2).decode(errors="replace")
         return None
     except Exception as e:
         logger.warning(f"Failed to get Cloudwatcher serial from {host}: {e}")
@@ -761,16 +1018,16 @@ def read_cloudwatcher_device(device_config: dict):
                 else:
                     logger.info(f"Cloudwatcher at {host} using IP-based code: {instrument_code}")
                 serial_obtained = True
+                data_store.register(instrument_code, "cloudwatcher", host, slot)
 
-            response = requests.get(url, timeout=10)
+            response = device_http.get(url, timeout=10)
             response.raise_for_status()
 
             # Parse key=value format
-            data = {}
-            for line in response.text.strip().split("\n"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    data[key.strip()] = value.strip()
+            data = {
+                m.group(1).decode(errors="replace"): m.group(2).decode(errors="replace")
+                for m in _CW_LINE.finditer(response.content)
+            }
 
             updates = {}
 
@@ -969,7 +1226,7 @@ class PowerStatusTracker:
         self._output_voltage: Optional[float] = None
         self._ups_status: Optional[str] = None
         self._ups_load: Optional[float] = None
-        self._last_update: Optional[datetime] = None
+        self._last_update: Optional[int] = None  # time.time_ns(), formatted in get_status()
         self._ups_model: Optional[str] = None
 
     def update(
@@ -991,7 +1248,7 @@ class PowerStatusTracker:
             self._output_voltage = output_voltage
             self._ups_load = ups_load
             self._ups_model = ups_model
-            self._last_update = datetime.utcnow()
+            self._last_update = time.time_ns()
 
             # Determine overall status
             # UPS status codes: OL=Online, OB=On Battery, LB=Low Battery
@@ -1010,7 +1267,7 @@ class PowerStatusTracker:
         """Mark UPS as offline/unreachable."""
         with self._lock:
             self._status = "down"
-            self._last_update = datetime.utcnow()
+            self._last_update = time.time_ns()
 
     def get_status(self) -> Dict[str, Any]:
         """Get current power status for heartbeat."""
@@ -1024,7 +1281,7 @@ class PowerStatusTracker:
                 "ups_status": self._ups_status,
                 "ups_load": self._ups_load,
                 "ups_model": self._ups_model,
-                "last_update": self._last_update.isoformat() if self._last_update else None,
+                "last_update": _fmt_ts(self._last_update) if self._last_update else None,
             }
 
 
@@ -1145,10 +1402,68 @@ BOM_SATELLITE_PRODUCTS = [
     {"id": "IDE00153", "prefix": "IDE00153", "suffix": ".jpg"},       # Hemisphere Full Disk
 ]
 
-BOM_SATELLITE_FTP = "ftp://ftp.bom.gov.au/anon/gen/gms"
+BOM_FTP_HOST = "ftp.bom.gov.au"
+BOM_SATELLITE_DIR = "/anon/gen/gms"
 
 # BOM Radar Products (from /anon/gen/radar/)
-BOM_RADAR_FTP = "ftp://ftp.bom.gov.au/anon/gen/radar"
+BOM_RADAR_DIR = "/anon/gen/radar"
+
+# Persistent anonymous FTP session to BOM, reused across products and cycles
+# so each fetch is a single LIST/RETR instead of a new process and login.
+# ftplib sessions are not thread-safe, so each BOM worker thread owns one.
+_bom_ftp_local = threading.local()
+
+# Concurrent BOM fetch/upload workers (kept small to be polite to BOM's FTP server)
+BOM_MAX_WORKERS = 4
+
+# Initial size of each worker's download buffer; covers the largest satellite loops
+BOM_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Errors that mean the control connection is gone (BOM drops idle sessions
+# with 421); permanent errors such as 550 are raised to the caller as-is
+_BOM_FTP_STALE_ERRORS = (OSError, EOFError, ftplib.error_temp, ftplib.error_reply)
+
+
+def _bom_ftp_call(fn):
+    """Run fn(ftp) on this thread's BOM FTP session, reconnecting once if it went stale."""
+    for attempt in range(2):
+        ftp = getattr(_bom_ftp_local, "ftp", None)
+        if ftp is None:
+            ftp = ftplib.FTP(BOM_FTP_HOST, timeout=30)
+            ftp.login()
+            _bom_ftp_local.ftp = ftp
+        try:
+            return fn(ftp)
+        except _BOM_FTP_STALE_ERRORS:
+            _bom_ftp_local.ftp = None
+            ftp.close()
+            if attempt:
+                raise
+
+
+def _bom_ftp_retr(path: str) -> memoryview:
+    """
+    Download a file from the BOM FTP server into this thread's reusable buffer.
+    The returned view is only valid until the same thread's next download,
+    which is fine because each BOM job fetches, hashes and uploads in turn.
+    """
+    buf = getattr(_bom_ftp_local, "buf", None)
+    if buf is None:
+        buf = _bom_ftp_local.buf = bytearray(BOM_BUFFER_SIZE)
+
+    def retr(ftp):
+        size = 0
+
+        def write(chunk):
+            nonlocal size
+            end = size + len(chunk)
+            buf[size:end] = chunk  # Grows the buffer if a file is larger than it
+            size = end
+
+        ftp.retrbinary(f"RETR {path}", write)
+        return size
+
+    return memoryview(buf)[:_bom_ftp_call(retr)]
 
 
 def get_radar_products():
@@ -1165,48 +1480,32 @@ def get_radar_products():
     ]
 
 
-def get_bom_timestamp(minutes_ago: int = 30) -> str:
-    """Generate BOM timestamp string (YYYYMMDDHHmm) rounded to 10 minutes."""
-    now = datetime.utcnow()
-    target = now - timedelta(minutes=minutes_ago)
-    target = target.replace(minute=(target.minute // 10) * 10, second=0, microsecond=0)
-    return target.strftime("%Y%m%d%H%M")
+def list_bom_satellite_files() -> Optional[str]:
+    """List the BOM satellite FTP directory (one filename per line)."""
+    try:
+        return "\n".join(_bom_ftp_call(lambda ftp: ftp.nlst(BOM_SATELLITE_DIR)))
+    except Exception as e:
+        logger.warning(f"BOM satellite: FTP listing failed - {e}")
+        return None
 
 
-def fetch_bom_satellite(product: dict) -> Optional[bytes]:
+def fetch_bom_satellite(product: dict, listing: str) -> Optional[memoryview]:
     """
-    Fetch latest BOM satellite image by querying FTP directory listing once.
+    Fetch latest BOM satellite image using this cycle's FTP directory listing.
 
     This optimized approach:
-    1. Lists the FTP directory once (instead of trying 12 timestamp URLs)
-    2. Finds the latest matching file for this product
+    1. Lists the FTP directory once per cycle (instead of trying 12 timestamp URLs)
+    2. Finds the latest matching file for this product in that listing
     3. Fetches that specific file
 
-    This reduces FTP requests from 12 per product to 2 per product (list + fetch).
+    This reduces FTP requests to one RETR per product plus one shared LIST,
+    sent over the worker's BOM FTP session.
     """
-    import subprocess
-    import re
-
-    ftp_dir = f"{BOM_SATELLITE_FTP}/"
     prefix = product['prefix']
     suffix = product['suffix']
 
     try:
-        # Get directory listing
-        result = subprocess.run(
-            ["curl", "-s", "--connect-timeout", "10", ftp_dir],
-            capture_output=True,
-            timeout=15
-        )
-
-        if result.returncode != 0:
-            logger.warning(f"BOM {product['id']}: FTP listing failed")
-            return None
-
-        listing = result.stdout.decode("utf-8", errors="ignore")
-
         # Parse listing for files matching this product
-        # FTP listing format varies, but filename is typically last item on each line
         # Pattern: prefix.YYYYMMDDHHMM.suffix (e.g., IDE00135.202601210300.jpg)
         pattern = re.compile(
             rf"({re.escape(prefix)}\.(\d{{12}}){re.escape(suffix)})"
@@ -1223,21 +1522,17 @@ def fetch_bom_satellite(product: dict) -> Optional[bytes]:
         matches.sort(key=lambda x: x[1], reverse=True)
         latest_file = matches[0][0]
 
-        # Fetch the latest file
-        url = f"{ftp_dir}{latest_file}"
-        result = subprocess.run(
-            ["curl", "-s", "--max-time", "30", "-o", "-", url],
-            capture_output=True,
-            timeout=45
-        )
+        # Fetch the latest file (a missing file raises error_perm, so no
+        # error page can arrive in place of the image; only guard empty files)
+        image_data = _bom_ftp_retr(f"{BOM_SATELLITE_DIR}/{latest_file}")
 
-        if result.returncode == 0 and len(result.stdout) > 1000:
+        if image_data:
             logger.debug(f"BOM {product['id']}: fetched {latest_file}")
-            return result.stdout
+            return image_data
         else:
-            logger.warning(f"BOM {product['id']}: fetch failed for {latest_file}")
+            logger.warning(f"BOM {product['id']}: empty file {latest_file}")
 
-    except subprocess.TimeoutExpired:
+    except socket.timeout:
         logger.warning(f"BOM {product['id']}: timeout")
     except Exception as e:
         logger.warning(f"BOM {product['id']}: error - {e}")
@@ -1245,21 +1540,13 @@ def fetch_bom_satellite(product: dict) -> Optional[bytes]:
     return None
 
 
-def fetch_bom_radar(product: dict) -> Optional[bytes]:
-    """Fetch a BOM radar animated GIF loop via FTP using curl."""
-    import subprocess
-
-    url = f"{BOM_RADAR_FTP}/{product['code']}.gif"
-
+def fetch_bom_radar(product: dict) -> Optional[memoryview]:
+    """Fetch a BOM radar animated GIF loop over the worker's BOM FTP session."""
     try:
-        result = subprocess.run(
-            ["curl", "-s", "--connect-timeout", "10", "-o", "-", url],
-            capture_output=True,
-            timeout=30
-        )
-        if result.returncode == 0 and len(result.stdout) > 1000:
+        image_data = _bom_ftp_retr(f"{BOM_RADAR_DIR}/{product['code']}.gif")
+        if image_data:
             logger.debug(f"BOM {product['id']}: fetched radar loop")
-            return result.stdout
+            return image_data
     except Exception as e:
         logger.warning(f"BOM {product['id']}: fetch error - {e}")
 
@@ -1267,16 +1554,61 @@ def fetch_bom_radar(product: dict) -> Optional[bytes]:
     return None
 
 
+def _fetch_and_push_bom(product: dict, fetch, content_type: str,
+                        image_hashes: Dict[str, str]) -> Optional[str]:
+    """
+    Fetch one BOM product and upload it if it changed.
+    Returns "uploaded", "unchanged", or None if nothing was pushed.
+    Runs on a BOM worker thread; each product only touches its own hash entry.
+    """
+    try:
+        image_data = fetch(product)
+        if not image_data:
+            return None
+
+        # Compute hash to detect changes
+        image_hash = hashlib.md5(image_data).hexdigest()
+
+        # Skip if unchanged
+        if image_hashes.get(product["id"]) == image_hash:
+            logger.debug(f"BOM {product['id']}: unchanged, skipping upload")
+            return "unchanged"
+
+        # Upload changed image as a raw body straight from the download
+        # buffer (no multipart copy)
+        response = api_http.post(
+            f"{CONFIG['remote_api']}/satellite",
+            params={"product_id": product["id"]},
+            data=image_data,
+            headers={"Content-Type": content_type},
+            timeout=60,
+        )
+
+        if response.ok:
+            # Update hash only on successful upload
+            image_hashes[product["id"]] = image_hash
+            logger.info(f"BOM {product['id']}: pushed successfully (new image)")
+            return "uploaded"
+        else:
+            logger.warning(f"BOM {product['id']}: push failed {response.status_code}")
+
+    except Exception as e:
+        logger.error(f"BOM {product['id']}: error - {e}")
+
+    return None
+
+
 def push_bom_imagery():
     """
     Fetch BOM satellite and radar images and push to remote API.
 
     Optimizations implemented:
-    1. Uses directory listing to find latest file (instead of 12 timestamp attempts)
+    1. Lists the satellite directory once per cycle to find the latest files
+       (instead of 12 timestamp attempts per product)
     2. Computes MD5 hash of each image and skips upload if unchanged
     3. Default interval increased to 30 minutes (configurable via BOM_SATELLITE_INTERVAL)
+    4. Fetches and uploads products concurrently on a small worker pool
     """
-    api_url = CONFIG["remote_api"]
     api_key = CONFIG["api_key"]
     interval = CONFIG.get("bom_satellite_interval", 1800)  # Default 30 minutes
 
@@ -1297,116 +1629,72 @@ def push_bom_imagery():
     logger.info(f"  Radar products: {len(radar_products)} (station: {CONFIG.get('bom_radar_station', 'none')})")
     logger.info(f"  Change detection: enabled (skips duplicate uploads)")
 
-    while True:
-        uploaded_count = 0
-        skipped_count = 0
-
-        # Fetch satellite images
-        for product in BOM_SATELLITE_PRODUCTS:
-            try:
-                image_data = fetch_bom_satellite(product)
-
-                if image_data:
-                    # Compute hash to detect changes
-                    image_hash = hashlib.md5(image_data).hexdigest()
-
-                    # Skip if unchanged
-                    if image_hashes.get(product["id"]) == image_hash:
-                        logger.debug(f"BOM {product['id']}: unchanged, skipping upload")
-                        skipped_count += 1
-                        continue
-
-                    # Upload changed image
-                    files = {
-                        "image": (f"{product['id']}.jpg", image_data, "image/jpeg")
-                    }
-                    response = requests.post(
-                        f"{api_url}/satellite",
-                        files=files,
-                        data={"product_id": product["id"]},
-                        headers={"Authorization": f"Bearer {api_key}"},
-                        timeout=60,
-                    )
-
-                    if response.ok:
-                        # Update hash only on successful upload
-                        image_hashes[product["id"]] = image_hash
-                        uploaded_count += 1
-                        logger.info(f"BOM {product['id']}: pushed successfully (new image)")
-                    else:
-                        logger.warning(f"BOM {product['id']}: push failed {response.status_code}")
-
-            except Exception as e:
-                logger.error(f"BOM {product['id']}: error - {e}")
-
-            time.sleep(2)
+    radar_jobs = [(product, fetch_bom_radar, "image/gif") for product in radar_products]
 
-        # Fetch radar images
-        for product in radar_products:
-            try:
-                image_data = fetch_bom_radar(product)
-
-                if image_data:
-                    # Compute hash to detect changes
-                    image_hash = hashlib.md5(image_data).hexdigest()
-
-                    # Skip if unchanged
-                    if image_hashes.get(product["id"]) == image_hash:
-                        logger.debug(f"BOM {product['id']}: unchanged, skipping upload")
-                        skipped_count += 1
-                        continue
-
-                    # Upload changed image
-                    files = {
-                        "image": (f"{product['id']}.gif", image_data, "image/gif")
-                    }
-                    response = requests.post(
-                        f"{api_url}/satellite",
-                        files=files,
-                        data={"product_id": product["id"]},
-                        headers={"Authorization": f"Bearer {api_key}"},
-                        timeout=60,
-                    )
-
-                    if response.ok:
-                        # Update hash only on successful upload
-                        image_hashes[product["id"]] = image_hash
-                        uploaded_count += 1
-                        logger.info(f"BOM {product['id']}: pushed successfully (new image)")
-                    else:
-                        logger.warning(f"BOM {product['id']}: push failed {response.status_code}")
-
-            except Exception as e:
-                logger.error(f"BOM {product['id']}: error - {e}")
+    # Long-lived pool so worker threads keep their FTP sessions between cycles
+    with ThreadPoolExecutor(max_workers=BOM_MAX_WORKERS, thread_name_prefix="bom") as pool:
+        while True:
+            # One directory listing serves every satellite product this cycle
+            listing = list_bom_satellite_files()
+            jobs = list(radar_jobs)
+            if listing is not None:
+                fetch_satellite = partial(fetch_bom_satellite, listing=listing)
+                jobs += [(product, fetch_satellite, "image/jpeg") for product in BOM_SATELLITE_PRODUCTS]
 
-            time.sleep(2)
+            futures = [pool.submit(_fetch_and_push_bom, *job, image_hashes) for job in jobs]
+            results = [f.result() for f in as_completed(futures)]
 
-        logger.info(f"BOM cycle complete: {uploaded_count} uploaded, {skipped_count} unchanged")
-        time.sleep(interval)
+            uploaded_count = results.count("uploaded")
+            skipped_count = results.count("unchanged")
+            logger.info(f"BOM cycle complete: {uploaded_count} uploaded, {skipped_count} unchanged")
+            time.sleep(interval)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATA PUSHER
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# ((path, st_mtime_ns, st_size), bytes) of the last AllSky file read
+_allsky_cache: Tuple[Optional[tuple], Optional[bytes]] = (None, None)
+
+# (ETag, Last-Modified, bytes) of the last AllSky URL download, for conditional GETs
+_allsky_url_cache: Tuple[Optional[str], Optional[str], Optional[bytes]] = (None, None, None)
+
+
 def fetch_allsky_image() -> Optional[bytes]:
     """
     Fetch AllSky image from local file path or URL fallback.
     Returns image bytes or None if not available.
+    The local file is only re-read when its mtime or size changes, and the
+    URL is fetched with a conditional GET so an unchanged image is not re-downloaded.
     """
-    image_path = Path(CONFIG["allsky_image_path"]) if CONFIG["allsky_image_path"] else None
+    global _allsky_cache, _allsky_url_cache
+    image_path = CONFIG["allsky_image_path"]
     image_url = CONFIG["allsky_image_url"]
 
-    # Try local file first
-    if image_path and image_path.exists():
-        mtime = image_path.stat().st_mtime
-        age = time.time() - mtime
+    # Try local file first (one stat call covers existence, age and identity)
+    st = None
+    if image_path:
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            pass
+
+    if st is not None:
+        age = time.time() - st.st_mtime
 
         if age < 300:  # Image less than 5 minutes old
+            key = (image_path, st.st_mtime_ns, st.st_size)
+            cached_key, cached_data = _allsky_cache
+            if key == cached_key:
+                logger.debug(f"AllSky: reusing unchanged file (age: {age:.0f}s)")
+                return cached_data
             try:
                 with open(image_path, "rb") as f:
-                    logger.debug(f"AllSky: loaded from file (age: {age:.0f}s)")
-                    return f.read()
+                    data = f.read()
+                logger.debug(f"AllSky: loaded from file (age: {age:.0f}s)")
+                _allsky_cache = (key, data)
+                return data
             except Exception as e:
                 logger.warning(f"AllSky file read error: {e}")
         else:
@@ -1414,10 +1702,25 @@ def fetch_allsky_image() -> Optional[bytes]:
 
     # Fallback to URL if configured
     if image_url:
+        etag, last_modified, cached_data = _allsky_url_cache
+        headers = {}
+        if cached_data is not None:
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
         try:
-            response = requests.get(image_url, timeout=30)
+            response = device_http.get(image_url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                logger.debug(f"AllSky: URL image not modified")
+                return cached_data
             if response.ok and len(response.content) > 1000:
                 logger.debug(f"AllSky: loaded from URL")
+                _allsky_url_cache = (
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    response.content,
+                )
                 return response.content
             else:
                 logger.warning(f"AllSky URL returned invalid response: {response.status_code}")
@@ -1427,8 +1730,147 @@ def fetch_allsky_image() -> Optional[bytes]:
     return None
 
 
+# Re-send an unchanged instrument payload at least this often (seconds)
+PUSH_UNCHANGED_TTL = 300
+
+
+def _payload_digest(payload: dict) -> bytes:
+    """Stable digest of a payload, used to skip re-sending unchanged readings."""
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+# Spooled readings: one JSON payload per line, replayed oldest first. The
+# file only grows during outages; past SPOOL_MAX_BYTES the oldest half is
+# dropped, so it behaves as a ring buffer. Only the data pusher touches it.
+SPOOL_MAX_BYTES = 10 * 1024 * 1024
+SPOOL_BATCH_SIZE = 50  # The ingest endpoint's batch limit
+SPOOL_DROP_STATUS = frozenset({400, 422})  # Validation failures: replaying cannot help
+
+
+def _write_spool(path: str, lines: list) -> None:
+    """Atomically replace the spool with the given lines, removing it when empty."""
+    if not lines:
+        os.remove(path)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+
+
+def spool_payloads(batch: list, read_ns: Dict[str, int]) -> None:
+    """
+    Append payloads that could not be pushed, each stamped with when it was
+    read (read_ns maps instrument_code -> time.time_ns() of the reading).
+    """
+    path = CONFIG["push_spool_path"]
+    try:
+        with open(path, "ab") as f:
+            for payload in batch:
+                reading_at = _fmt_ts(read_ns[payload["instrument_code"]]) + "Z"
+                f.write(_dumps({**payload, "reading_at": reading_at}) + b"\n")
+            size = f.tell()
+        logger.info(f"Spooled {len(batch)} readings for a later push")
+
+        if size > SPOOL_MAX_BYTES:
+            with open(path, "rb") as f:
+                lines = f.readlines()
+            dropped = len(lines) // 2
+            _write_spool(path, lines[dropped:])
+            logger.warning(f"Spool over {SPOOL_MAX_BYTES} bytes, dropped {dropped} oldest readings")
+    except OSError as e:
+        logger.warning(f"Spool write failed: {e}")
+
+
+def drain_spool(api_url: str) -> bool:
+    """
+    Replay spooled readings in batches. Stops at the first network error or
+    non-validation error response (5xx, 401/403/404/429, ...) and keeps the
+    rest for the next cycle; batches that fail validation (400/422) are
+    dropped so one bad reading cannot block the spool.
+    Returns False if the API is still unreachable.
+    """
+    path = CONFIG["push_spool_path"]
+    try:
+        with open(path, "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return True
+    except OSError as e:
+        logger.warning(f"Spool read failed: {e}")
+        return True
+
+    sent = 0
+    reachable = True
+    try:
+        while sent < len(lines):
+            chunk = lines[sent:sent + SPOOL_BATCH_SIZE]
+            items = []
+            for line in chunk:
+                try:
+                    items.append(_loads(line))
+                except _JSONDecodeError:
+                    pass  # Torn write from a power cut; skip the line
+
+            if items:
+                _mark_push_progress()  # A long replay is progress, not a stall
+                response = post_json(f"{api_url}/data", {"batch": items}, timeout=30, compress=True)
+                if response.status_code in SPOOL_DROP_STATUS:
+                    logger.warning(f"Dropping {len(items)} spooled readings: {response.status_code} - {response.text}")
+                elif not response.ok:
+                    # Auth, routing, rate limit or server trouble: not the
+                    # readings' fault, so keep the rest of the spool
+                    logger.warning(f"Spool replay stopped: {response.status_code}")
+                    reachable = False
+                    break
+            sent += len(chunk)
+    except requests.RequestException as e:
+        logger.debug(f"Spool replay stopped: {e}")
+        reachable = False
+    finally:
+        if sent:
+            try:
+                _write_spool(path, lines[sent:])
+            except OSError as e:
+                logger.warning(f"Spool rewrite failed: {e}")
+            logger.info(f"Replayed {sent} spooled readings, {len(lines) - sent} left")
+    return reachable
+
+
+# Set by main() on shutdown so the pusher loops exit instead of sleeping on
+shutdown_event = threading.Event()
+
+# monotonic time the data pusher last made progress (None until it starts);
+# the systemd watchdog ping is withheld once this goes stale
+_push_progress: Optional[float] = None
+
+
+def _mark_push_progress() -> None:
+    """Record that the data pusher is still cycling (read by ping_watchdog())."""
+    global _push_progress
+    _push_progress = time.monotonic()
+
+
+def _rejected_indices(response: requests.Response) -> set:
+    """Batch indices the ingest API rejected as invalid (empty for older API versions)."""
+    try:
+        rejected = _loads(response.content).get("rejected") or []
+        return {item["index"] for item in rejected}
+    except (_JSONDecodeError, AttributeError, KeyError, TypeError):
+        return set()
+
+
 def push_data():
-    """Push data for all instruments."""
+    """
+    Push data for all instruments.
+    Instruments whose payload is unchanged since the last successful push are
+    skipped until PUSH_UNCHANGED_TTL has passed. Pushes every push_interval,
+    or straight away when the data store flags an urgent condition change.
+    Batches that fail with a network error or a non-validation error status
+    (5xx, 401/403/404/429, ...) are spooled to disk and replayed ahead of
+    the next successful push.
+    """
     api_url = CONFIG["remote_api"]
     api_key = CONFIG["api_key"]
 
@@ -1437,75 +1879,148 @@ def push_data():
         return
 
     logger.info(f"Starting data pusher, interval={CONFIG['push_interval']}s")
-    if CONFIG["allsky_image_path"]:
-        logger.info(f"AllSky file path: {CONFIG['allsky_image_path']}")
-    if CONFIG["allsky_image_url"]:
-        logger.info(f"AllSky URL fallback: {CONFIG['allsky_image_url']}")
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    # instrument_code -> (payload, digest, monotonic time) of the last push (or spool)
+    last_pushed: Dict[str, Tuple[Dict[str, Any], bytes, float]] = {}
 
-    while True:
+    spool_path = CONFIG["push_spool_path"]
+
+    while not shutdown_event.is_set():
+        _mark_push_progress()
         try:
-            # Push data for each instrument separately
-            all_data = data_store.get_all()
+            # Replay readings spooled during an outage before the live ones
+            reachable = drain_spool(api_url) if spool_path else True
 
-            for instrument_code, data in all_data.items():
-                if not data.get("timestamp"):
+            # Push every changed instrument in one batched request
+            all_data = data_store.get_all()
+            now = time.monotonic()
+            batch = []
+            digests: Dict[str, bytes] = {}
+            read_ns: Dict[str, int] = {}
+
+            for instrument_code in all_data:
+                timed = data_store.get_timed_payload(instrument_code)
+                if timed is None:
                     continue  # Skip instruments with no data
+                payload, ts_ns = timed
 
-                # Add instrument_code to payload
-                payload = {
-                    "instrument_code": instrument_code,
-                    **{k: v for k, v in data.items() if k != "timestamp"}
-                }
-
-                response = requests.post(
-                    f"{api_url}/data",
-                    json=payload,
-                    headers=headers,
-                    timeout=30,
-                )
-
-                if response.ok:
-                    logger.info(f"Pushed {instrument_code} data at {datetime.now()}")
+                previous = last_pushed.get(instrument_code)
+                if previous and previous[0] is payload:
+                    digest = previous[1]  # Same payload object: no update since
+                else:
+                    digest = _payload_digest(payload)
+                if previous and previous[1] == digest and now - previous[2] < PUSH_UNCHANGED_TTL:
+                    continue  # Nothing new since the last push
+
+                batch.append(payload)
+                digests[instrument_code] = digest
+                read_ns[instrument_code] = ts_ns
+
+            if batch:
+                response = None
+                # While the spool replay says the API is down, spool straight
+                # away instead of waiting on another timeout
+                if reachable:
+                    try:
+                        response = post_json(f"{api_url}/data", {"batch": batch}, timeout=30, compress=True)
+                    except requests.RequestException as e:
+                        if not spool_path:
+                            raise
+                        logger.error(f"Push error: {e}")
+
+                if response is not None and response.ok:
+                    # Invalid readings are rejected one by one; the rest are stored
+                    rejected = _rejected_indices(response)
+                    if rejected:
+                        codes = ", ".join(batch[i]["instrument_code"] for i in sorted(rejected))
+                        logger.warning(f"API rejected invalid readings from {codes}")
+                        batch = [payload for i, payload in enumerate(batch) if i not in rejected]
+                    codes = ", ".join(payload["instrument_code"] for payload in batch)
+                    logger.info(f"Pushed {len(batch)} instruments ({codes})")  # asctime stamps the line
+                elif spool_path and (response is None or response.status_code not in SPOOL_DROP_STATUS):
+                    if response is not None:
+                        logger.warning(f"Push failed for {', '.join(digests)}: {response.status_code}")
+                    # The spool owns these readings now; don't resend them live
+                    spool_payloads(batch, read_ns)
                 else:
-                    logger.warning(f"Push failed for {instrument_code}: {response.status_code} - {response.text}")
+                    logger.warning(f"Push failed for {', '.join(digests)}: {response.status_code} - {response.text}")
+                    batch = []
+
+                for payload in batch:
+                    instrument_code = payload["instrument_code"]
+                    last_pushed[instrument_code] = (payload, digests[instrument_code], now)
+
+        except requests.RequestException as e:
+            logger.error(f"Push error: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected push error: {e}")
+
+        if data_store.urgent.wait(CONFIG["push_interval"]):
+            data_store.urgent.clear()  # Woken early: push the urgent change now
+
+
+def push_allsky():
+    """
+    Push the AllSky image on the push interval, skipping images that have
+    already been uploaded. Runs on its own thread so a slow image upload
+    never delays readings.
+    """
+    api_url = CONFIG["remote_api"]
+
+    if not CONFIG["api_key"]:
+        return  # push_data already logs the missing key
+
+    if not (CONFIG["allsky_image_path"] or CONFIG["allsky_image_url"]):
+        logger.info("No AllSky source configured, image push disabled")
+        return
+
+    if CONFIG["allsky_image_path"]:
+        logger.info(f"AllSky file path: {CONFIG['allsky_image_path']}")
+    if CONFIG["allsky_image_url"]:
+        logger.info(f"AllSky URL fallback: {CONFIG['allsky_image_url']}")
 
-            # Push AllSky image
+    # fetch_allsky_image() returns the same bytes object while the image is
+    # unchanged, so identity tells us whether it has already been uploaded
+    last_pushed: Optional[bytes] = None
+
+    while not shutdown_event.is_set():
+        try:
             image_data = fetch_allsky_image()
-            if image_data:
-                files = {"image": ("allsky.jpg", image_data, "image/jpeg")}
-                img_response = requests.post(
+            if image_data is not None and image_data is last_pushed:
+                logger.debug("AllSky image unchanged, skipping upload")
+            elif image_data:
+                # Raw JPEG body: no multipart copy of a multi-MB image
+                img_response = api_http.post(
                     f"{api_url}/image",
-                    files=files,
-                    headers={"Authorization": f"Bearer {api_key}"},
+                    data=image_data,
+                    headers=_JPEG_HEADERS,
                     timeout=60,
                 )
                 if img_response.ok:
+                    last_pushed = image_data
                     logger.debug("AllSky image pushed")
                 else:
                     logger.warning(f"Image push failed: {img_response.status_code}")
 
         except requests.RequestException as e:
-            logger.error(f"Push error: {e}")
+            logger.error(f"Image push error: {e}")
         except Exception as e:
-            logger.error(f"Unexpected push error: {e}")
+            logger.error(f"Unexpected image push error: {e}")
 
-        time.sleep(CONFIG["push_interval"])
+        shutdown_event.wait(CONFIG["push_interval"])
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIG PUSHER - Tell server what instruments are expected
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Unique collector ID based on hostname, resolved once at startup
+_COLLECTOR_ID = f"pi-{socket.gethostname()}"
+
+
 def get_collector_id() -> str:
-    """Generate a unique collector ID based on hostname."""
-    import socket
-    hostname = socket.gethostname()
-    return f"pi-{hostname}"
+    """Return the unique collector ID based on hostname."""
+    return _COLLECTOR_ID
 
 
 def build_expected_instruments() -> list:
@@ -1515,91 +2030,42 @@ def build_expected_instruments() -> list:
     successfully connected and sent readings). This avoids registering
     duplicate IP-based codes when we already have the serial-based code.
     """
-    instruments = []
+    return [data_store.get_meta(code) for code in data_store.get_all()]
 
-    # Get current instrument codes from data_store
-    # These are only instruments that have successfully sent data
-    all_data = data_store.get_all()
-    known_codes = set(all_data.keys())
-
-    # Only register instruments that have reported data
-    for code in known_codes:
-        # Infer type from code prefix
-        if code.startswith("sqm-"):
-            inst_type = "sqm"
-        elif code.startswith("davis-"):
-            inst_type = "weather_station"
-        elif code.startswith("cw-"):
-            inst_type = "cloudwatcher"
-        else:
-            inst_type = "unknown"
-
-        instruments.append({
-            "code": code,
-            "type": inst_type,
-            "host": "auto-detected",
-            "slot": 0,
-        })
 
-    return instruments
+# Config is pushed hourly, after a short wait for instruments to be discovered
+CONFIG_PUSH_INTERVAL = 3600
+CONFIG_PUSH_DELAY = 15
 
 
 def push_config():
     """
     Push instrument configuration to the server.
     This tells the server which instruments are expected to report data.
-    Runs on startup and periodically to keep the server in sync.
+    Runs on startup and periodically (via the scheduler) to keep the server in sync.
     """
-    api_url = CONFIG["remote_api"]
-    api_key = CONFIG["api_key"]
-
-    if not api_key:
-        logger.warning("No API key, config push disabled")
-        return
-
-    collector_id = get_collector_id()
-    config_interval = 3600  # Push config every hour
-    initial_delay = 15  # Wait for instruments to be discovered
-
-    logger.info(f"Starting config pusher, collector_id={collector_id}")
-    logger.info(f"Waiting {initial_delay}s for instrument discovery...")
-    time.sleep(initial_delay)
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    while True:
-        try:
-            instruments = build_expected_instruments()
-            logger.info(f"Config push: {len(instruments)} instruments to register")
-
-            payload = {
-                "collector_id": collector_id,
-                "instruments": instruments,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
+    try:
+        instruments = build_expected_instruments()
+        logger.info(f"Config push: {len(instruments)} instruments to register")
 
-            response = requests.post(
-                f"{api_url}/config",
-                json=payload,
-                headers=headers,
-                timeout=30,
-            )
+        payload = {
+            "collector_id": get_collector_id(),
+            "instruments": instruments,
+            "timestamp": _fmt_ts(time.time_ns()),
+        }
 
-            if response.ok:
-                result = response.json()
-                logger.info(f"Config pushed: {result.get('instruments_registered', 0)} instruments registered")
-            else:
-                logger.warning(f"Config push failed: {response.status_code} - {response.text}")
+        response = post_json(f"{CONFIG['remote_api']}/config", payload, timeout=30)
 
-        except requests.RequestException as e:
-            logger.error(f"Config push error: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected config push error: {e}")
+        if response.ok:
+            registered = _loads(response.content).get("instruments_registered", 0)
+            logger.info(f"Config pushed: {registered} instruments registered")
+        else:
+            logger.warning(f"Config push failed: {response.status_code} - {response.text}")
 
-        time.sleep(config_interval)
+    except requests.RequestException as e:
+        logger.error(f"Config push error: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected config push error: {e}")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1610,10 +2076,13 @@ def push_config():
 COLLECTOR_START_TIME = time.time()
 COLLECTOR_VERSION = "2.0.0"
 
+HEARTBEAT_INTERVAL = 60  # Send heartbeat every minute
+HEARTBEAT_DELAY = 10  # Brief wait for instruments to be discovered
+
 
 def push_heartbeat():
     """
-    Send periodic heartbeat to the server with instrument health statuses.
+    Send a heartbeat to the server with instrument health statuses.
 
     The heartbeat includes:
     - List of instruments the collector is monitoring
@@ -1623,89 +2092,161 @@ def push_heartbeat():
     The server uses this as the source of truth for instrument health.
     It no longer computes health from staleness - it trusts the collector.
     """
-    api_url = CONFIG["remote_api"]
-    api_key = CONFIG["api_key"]
+    # Build base URL - remove /ingest suffix to get to /heartbeat
+    base_url = CONFIG["remote_api"].replace("/ingest", "")
 
-    if not api_key:
-        logger.warning("No API key, heartbeat disabled")
+    try:
+        # Get list of instruments that have reported data
+        all_data = data_store.get_all()
+        active_instruments = [
+            code for code, data in all_data.items()
+            if data.get("_ts_ns")
+        ]
+
+        # Get health status for each instrument from the health tracker
+        instrument_health = health_tracker.snapshot(active_instruments)
+
+        uptime_seconds = int(time.time() - COLLECTOR_START_TIME)
+
+        # Get power status if UPS monitoring is enabled
+        power_status = None
+        if CONFIG["nut_ups_name"]:
+            power_status = power_tracker.get_status()
+
+        payload = {
+            "instruments": active_instruments,
+            "instrument_health": instrument_health,
+            "collector_version": COLLECTOR_VERSION,
+            "uptime_seconds": uptime_seconds,
+            "power_status": power_status,
+        }
+
+        response = post_json(f"{base_url}/heartbeat", payload, timeout=10)  # Short timeout for heartbeat
+
+        if response.ok:
+            # Log health summary
+            degraded = [c for c, h in instrument_health.items() if h["status"] == "DEGRADED"]
+            offline = [c for c, h in instrument_health.items() if h["status"] == "OFFLINE"]
+            healthy = len(active_instruments) - len(degraded) - len(offline)
+            logger.debug(f"Heartbeat sent: {healthy} healthy, {len(degraded)} degraded, {len(offline)} offline")
+        else:
+            logger.warning(f"Heartbeat failed: {response.status_code}")
+
+    except requests.RequestException as e:
+        logger.debug(f"Heartbeat error: {e}")  # Debug level - don't spam logs
+    except Exception as e:
+        logger.error(f"Unexpected heartbeat error: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCHEDULER - Runs the periodic server pushes on one thread
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# systemd sets WATCHDOG_USEC when the unit has WatchdogSec=; ping at half that
+WATCHDOG_INTERVAL = int(os.environ.get("WATCHDOG_USEC", "0")) / 2_000_000
+# Slack on top of push_interval for one push cycle (spool replay, 30s POST timeouts)
+WATCHDOG_PUSH_GRACE = 300
+
+# Names of worker threads that died from an uncaught exception
+_crashed_threads: list = []
+
+
+def _record_thread_crash(args) -> None:
+    """threading.excepthook: remember the dead thread, then print the traceback as usual."""
+    _crashed_threads.append(args.thread.name if args.thread else "unknown")
+    threading.__excepthook__(args)
+
+
+def sd_notify(state: str) -> None:
+    """Send a state such as READY=1 or WATCHDOG=1 to systemd (no-op outside systemd)."""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
         return
+    if address.startswith("@"):
+        address = "\0" + address[1:]  # Abstract namespace socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(state.encode(), address)
+    except OSError as e:
+        logger.warning(f"sd_notify({state}) failed: {e}")
 
-    heartbeat_interval = 60  # Send heartbeat every minute
-    initial_delay = 10  # Brief wait for instruments to be discovered
 
-    logger.info(f"Starting heartbeat, interval={heartbeat_interval}s")
-    time.sleep(initial_delay)
+def ping_watchdog():
+    """
+    Tell systemd the collector is alive (WatchdogSec= in the unit), but only
+    while it is: no worker thread has crashed and the data pusher has made
+    progress within one push interval. Otherwise systemd restarts it.
+    """
+    if _crashed_threads:
+        logger.error(f"Withholding watchdog ping, threads crashed: {', '.join(_crashed_threads)}")
+        return
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    if _push_progress is not None:
+        stalled = time.monotonic() - _push_progress
+        if stalled > CONFIG["push_interval"] + WATCHDOG_PUSH_GRACE:
+            logger.error(f"Withholding watchdog ping, data pusher stalled for {stalled:.0f}s")
+            return
 
-    # Build base URL - remove /ingest suffix to get to /heartbeat
-    base_url = api_url.replace("/ingest", "")
+    sd_notify("WATCHDOG=1")
 
-    while True:
-        try:
-            # Get list of instruments that have reported data
-            all_data = data_store.get_all()
-            active_instruments = [
-                code for code, data in all_data.items()
-                if data.get("timestamp")
-            ]
-
-            # Get health status for each instrument from the health tracker
-            instrument_health = {}
-            for code in active_instruments:
-                status = health_tracker.get_status(code)
-                instrument_health[code] = {
-                    "status": status,
-                    "failure_rate": health_tracker.get_failure_rate(code),
-                }
-
-            uptime_seconds = int(time.time() - COLLECTOR_START_TIME)
-
-            # Get power status if UPS monitoring is enabled
-            power_status = None
-            if CONFIG["nut_ups_name"]:
-                power_status = power_tracker.get_status()
-
-            payload = {
-                "instruments": active_instruments,
-                "instrument_health": instrument_health,
-                "collector_version": COLLECTOR_VERSION,
-                "uptime_seconds": uptime_seconds,
-                "power_status": power_status,
-            }
 
-            response = requests.post(
-                f"{base_url}/heartbeat",
-                json=payload,
-                headers=headers,
-                timeout=10,  # Short timeout for heartbeat
-            )
-
-            if response.ok:
-                # Log health summary
-                degraded = [c for c, h in instrument_health.items() if h["status"] == "DEGRADED"]
-                offline = [c for c, h in instrument_health.items() if h["status"] == "OFFLINE"]
-                healthy = len(active_instruments) - len(degraded) - len(offline)
-                logger.debug(f"Heartbeat sent: {healthy} healthy, {len(degraded)} degraded, {len(offline)} offline")
-            else:
-                logger.warning(f"Heartbeat failed: {response.status_code}")
+def run_scheduled_pushes():
+    """
+    Run the config push, heartbeat and systemd watchdog ping on a single
+    sched-driven thread. Each job re-queues itself after it finishes, so a
+    slow run delays its next run instead of overlapping it.
+    """
+    jobs = []  # (initial delay, interval, job)
 
-        except requests.RequestException as e:
-            logger.debug(f"Heartbeat error: {e}")  # Debug level - don't spam logs
-        except Exception as e:
-            logger.error(f"Unexpected heartbeat error: {e}")
+    if CONFIG["api_key"]:
+        jobs.append((CONFIG_PUSH_DELAY, CONFIG_PUSH_INTERVAL, push_config))
+        jobs.append((HEARTBEAT_DELAY, HEARTBEAT_INTERVAL, push_heartbeat))
+        logger.info(f"Starting config pusher, collector_id={get_collector_id()}, interval={CONFIG_PUSH_INTERVAL}s")
+        logger.info(f"Starting heartbeat, interval={HEARTBEAT_INTERVAL}s")
+    else:
+        logger.warning("No API key, config push and heartbeat disabled")
+
+    if WATCHDOG_INTERVAL:
+        jobs.append((0, WATCHDOG_INTERVAL, ping_watchdog))
+        logger.info(f"Pinging systemd watchdog every {WATCHDOG_INTERVAL:g}s")
+
+    if not jobs:
+        return
+
+    scheduler = sched.scheduler(time.monotonic, time.sleep)
+
+    def run(interval, job):
+        job()
+        scheduler.enter(interval, 1, run, (interval, job))
 
-        time.sleep(heartbeat_interval)
+    for delay, interval, job in jobs:
+        scheduler.enter(delay, 1, run, (interval, job))
+    scheduler.run()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════════
 
+STATUS_INTERVAL = 3600  # Seconds between status log blocks; liveness is the systemd watchdog's job
+THREAD_STACK_SIZE = 1024 * 1024  # Workers recurse shallowly; the 8 MiB default is overkill
+
+
+def log_status(signum=None, frame=None):
+    """Log a summary of active instruments (signal handler for SIGALRM/SIGUSR1)."""
+    all_data = data_store.get_all()
+    logger.info(f"Status: {len(all_data)} instruments active")
+    for code, data in all_data.items():
+        logger.info(f"  {code}: {len(data)} fields")
+        if _DEBUG:
+            logger.debug(f"  {code}: {list(data)}")
+
+
 def main():
+    # Every thread here blocks on I/O and releases the GIL while it waits, so
+    # a longer switch interval (default 5ms) only cuts forced GIL handoffs
+    sys.setswitchinterval(0.02)
+
     logger.info("=" * 60)
     logger.info("Observatory Data Collector Starting (Multi-Instrument)")
     logger.info("=" * 60)
@@ -1731,6 +2272,11 @@ def main():
     for d in cloudwatcher_devices:
         logger.info(f"    Slot {d['slot']}: {d['host']} (interval: {d['interval']}s)")
 
+    # Before any thread starts (paho's network loop included): one 8 MiB stack
+    # per reader adds up on a 32-bit Pi
+    threading.stack_size(THREAD_STACK_SIZE)
+    threading.excepthook = _record_thread_crash
+
     mqtt_client = start_mqtt()
 
     threads = []
@@ -1765,10 +2311,10 @@ def main():
         )
         threads.append(t)
 
-    # Add data pusher, config pusher, heartbeat, BOM imagery, and NUT UPS threads
+    # Add data pusher, AllSky pusher, config/heartbeat scheduler, BOM imagery, and NUT UPS threads
     threads.append(threading.Thread(target=push_data, daemon=True, name="pusher"))
-    threads.append(threading.Thread(target=push_config, daemon=True, name="config-pusher"))
-    threads.append(threading.Thread(target=push_heartbeat, daemon=True, name="heartbeat"))
+    threads.append(threading.Thread(target=push_allsky, daemon=True, name="allsky-pusher"))
+    threads.append(threading.Thread(target=run_scheduled_pushes, daemon=True, name="scheduler"))
     threads.append(threading.Thread(target=push_bom_imagery, daemon=True, name="bom-imagery"))
 
     # Add NUT UPS reader if configured
@@ -1779,15 +2325,23 @@ def main():
         logger.info(f"Starting thread: {t.name}")
         t.start()
 
+    sd_notify("READY=1")
+
+    # Status every STATUS_INTERVAL via SIGALRM, or on demand with SIGUSR1;
+    # SIGTERM (systemctl stop) shuts down like Ctrl+C
+    signal.signal(signal.SIGALRM, log_status)
+    signal.signal(signal.SIGUSR1, log_status)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    signal.setitimer(signal.ITIMER_REAL, STATUS_INTERVAL, STATUS_INTERVAL)
+
     try:
         while True:
-            time.sleep(300)
-            all_data = data_store.get_all()
-            logger.info(f"Status: {len(all_data)} instruments active")
-            for code, data in all_data.items():
-                logger.info(f"  {code}: {list(data.keys())}")
+            signal.pause()  # Main thread parks in the kernel between signals
     except KeyboardInterrupt:
         logger.info("Shutting down...")
+        sd_notify("STOPPING=1")
+        shutdown_event.set()
+        data_store.urgent.set()  # Wake the data pusher so it sees the shutdown
         if mqtt_client:
             mqtt_client.loop_stop()
         sys.exit(0)
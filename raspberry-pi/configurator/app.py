@@ -6,18 +6,29 @@ Run with: python app.py
 Access at: http://localhost:8080 or http://raspberrypi.local:8080
 """
 
+import hmac
 import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
 from flask import Flask, render_template, request, jsonify, redirect, url_for, Response
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: stock Flask JSON is used without it
+    orjson = None
 
 from utils import (
-    load_env,
+    load_env_cached,
+    env_version,
     save_env,
     mask_api_key,
     get_service_status,
     control_service,
-    get_logs,
+    iter_logs,
+    get_raw_logs,
     test_api_connection,
     test_sqm_connection,
     test_weatherlink_connection,
@@ -27,16 +38,35 @@ from utils import (
     DEFAULTS,
 )
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, so jsonify() serializes in native code."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
+app.config["MAX_CONTENT_LENGTH"] = 256 * 1024  # Request bodies are small JSON documents
+if orjson is not None:
+    app.json = OrjsonProvider(app)  # Compact, unsorted output
+else:
+    # Stock provider: never pretty-print or sort keys, the UI parses it anyway
+    app.json.compact = True
+    app.json.sort_keys = False
 
 # Optional password protection
 CONFIGURATOR_PASSWORD = os.environ.get("CONFIGURATOR_PASSWORD", "")
+_PASSWORD_BYTES = CONFIGURATOR_PASSWORD.encode()
 
 
 def check_auth(password):
-    """Check if password matches."""
-    return password == CONFIGURATOR_PASSWORD
+    """Check if password matches (constant-time, so timing leaks nothing)."""
+    # Compare bytes: compare_digest rejects non-ASCII str arguments
+    return hmac.compare_digest((password or "").encode(), _PASSWORD_BYTES)
 
 
 def authenticate():
@@ -50,11 +80,12 @@ def authenticate():
 
 def requires_auth(f):
     """Decorator for password-protected routes."""
+    # Without a password the route is returned as-is: no per-request wrapper
+    if not CONFIGURATOR_PASSWORD:
+        return f
+
     @wraps(f)
     def decorated(*args, **kwargs):
-        if not CONFIGURATOR_PASSWORD:
-            return f(*args, **kwargs)
-
         auth = request.authorization
         if not auth or not check_auth(auth.password):
             return authenticate()
@@ -67,12 +98,26 @@ def requires_auth(f):
 # PAGE ROUTES
 # =============================================================================
 
+# page -> (config dict, extra key, rendered HTML). load_env_cached() returns
+# the same dict until .env changes, so identity tells us the config is unchanged
+_page_cache = {}
+
+
+def render_cached(page, template, config, key=None, **context):
+    """Render a page, reusing the last HTML while config and key are unchanged."""
+    cached = _page_cache.get(page)
+    if cached and cached[0] is config and cached[1] == key:
+        return cached[2]
+    html = render_template(template, config=config, **context)
+    _page_cache[page] = (config, key, html)
+    return html
+
 
 @app.route("/")
 @requires_auth
 def index():
     """Redirect to wizard if not configured, otherwise status."""
-    config = load_env()
+    config = load_env_cached()
     if not config.get("API_KEY") or config.get("REMOTE_API_URL") == DEFAULTS["REMOTE_API_URL"]:
         return redirect(url_for("wizard"))
     return redirect(url_for("status"))
@@ -82,10 +127,11 @@ def index():
 @requires_auth
 def wizard():
     """Setup wizard page."""
-    config = load_env()
-    return render_template(
+    config = load_env_cached()
+    return render_cached(
+        "wizard",
         "wizard.html",
-        config=config,
+        config,
         masked_key=mask_api_key(config.get("API_KEY", "")),
         radar_stations=BOM_RADAR_STATIONS,
     )
@@ -95,11 +141,14 @@ def wizard():
 @requires_auth
 def status():
     """Status dashboard page."""
-    config = load_env()
+    config = load_env_cached()
     service = get_service_status()
-    return render_template(
+    # Service state is rendered into the page, so it is part of the key
+    return render_cached(
+        "status",
         "status.html",
-        config=config,
+        config,
+        key=service,
         service=service,
         masked_key=mask_api_key(config.get("API_KEY", "")),
     )
@@ -109,10 +158,11 @@ def status():
 @requires_auth
 def config_page():
     """Full configuration editor page."""
-    config = load_env()
-    return render_template(
+    config = load_env_cached()
+    return render_cached(
+        "config",
         "config.html",
-        config=config,
+        config,
         masked_key=mask_api_key(config.get("API_KEY", "")),
         radar_stations=BOM_RADAR_STATIONS,
         defaults=DEFAULTS,
@@ -131,44 +181,47 @@ def logs_page():
 # =============================================================================
 
 
+# (slot, host key, port/interval key) for each multi-device slot
+_SQM_SLOTS = tuple((i, f"SQM_{i}_HOST", f"SQM_{i}_PORT") for i in range(1, 4))
+_DAVIS_SLOTS = tuple((i, f"DAVIS_{i}_HOST", f"DAVIS_{i}_INTERVAL") for i in range(1, 4))
+_CLOUDWATCHER_SLOTS = tuple(
+    (i, f"CLOUDWATCHER_{i}_HOST", f"CLOUDWATCHER_{i}_INTERVAL") for i in range(1, 4)
+)
+
+
 @app.route("/api/status")
 @requires_auth
 def api_status():
     """Get current service status and configuration."""
-    config = load_env()
+    config = load_env_cached()
     service = get_service_status()
 
-    # Build multi-device status info
-    sqm_devices = []
-    davis_devices = []
-    cloudwatcher_devices = []
-
-    for i in range(1, 4):
-        sqm_host = config.get(f"SQM_{i}_HOST", "")
-        if sqm_host:
-            sqm_devices.append({
-                "slot": i,
-                "host": sqm_host,
-                "port": config.get(f"SQM_{i}_PORT", "10001"),
-            })
-
-        davis_host = config.get(f"DAVIS_{i}_HOST", "")
-        if davis_host:
-            davis_devices.append({
-                "slot": i,
-                "host": davis_host,
-                "interval": config.get(f"DAVIS_{i}_INTERVAL", "30"),
-            })
-
-        cw_host = config.get(f"CLOUDWATCHER_{i}_HOST", "")
-        if cw_host:
-            cloudwatcher_devices.append({
-                "slot": i,
-                "host": cw_host,
-                "interval": config.get(f"CLOUDWATCHER_{i}_INTERVAL", "30"),
-            })
-
-    return jsonify({
+    # The response depends only on .env and the service state; pollers
+    # that already hold it get a bodyless 304
+    etag = "%x" % zlib.crc32(repr((env_version(), sorted(service.items()))).encode())
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    # Build multi-device status info, listing only slots with a host set
+    sqm_devices = [
+        {"slot": i, "host": host, "port": config.get(port_key, "10001")}
+        for i, host_key, port_key in _SQM_SLOTS
+        if (host := config.get(host_key))
+    ]
+    davis_devices = [
+        {"slot": i, "host": host, "interval": config.get(interval_key, "30")}
+        for i, host_key, interval_key in _DAVIS_SLOTS
+        if (host := config.get(host_key))
+    ]
+    cloudwatcher_devices = [
+        {"slot": i, "host": host, "interval": config.get(interval_key, "30")}
+        for i, host_key, interval_key in _CLOUDWATCHER_SLOTS
+        if (host := config.get(host_key))
+    ]
+
+    response = jsonify({
         "service": service,
         "config": {
             "api_url": config.get("REMOTE_API_URL", ""),
@@ -181,17 +234,27 @@ def api_status():
             "push_interval": config.get("PUSH_INTERVAL", "60"),
         },
     })
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# (config dict, serialized masked config) for api_get_config()
+_config_json = (None, None)
 
 
 @app.route("/api/config", methods=["GET"])
 @requires_auth
 def api_get_config():
     """Get current configuration (with masked API key)."""
-    config = load_env()
-    # Mask sensitive values
-    safe_config = config.copy()
-    safe_config["API_KEY"] = mask_api_key(config.get("API_KEY", ""))
-    return jsonify(safe_config)
+    global _config_json
+    config = load_env_cached()
+    cached_config, body = _config_json
+    if cached_config is not config:
+        # Mask sensitive values; serialized once per .env change
+        body = app.json.dumps({**config, "API_KEY": mask_api_key(config.get("API_KEY", ""))})
+        _config_json = (config, body)
+    return Response(body, mimetype="application/json")
 
 
 @app.route("/api/config", methods=["POST"])
@@ -202,17 +265,17 @@ def api_save_config():
         data = request.get_json()
 
         # Load existing config to preserve API key if not changed
-        existing = load_env()
+        existing = load_env_cached()
 
         # If API key looks masked, keep the existing one
         if data.get("API_KEY", "").startswith("****"):
             data["API_KEY"] = existing.get("API_KEY", "")
 
-        # Merge with existing config
-        new_config = existing.copy()
-        new_config.update(data)
+        # Merge with existing config (a new dict; the cached one is shared)
+        new_config = existing | data
 
         if save_env(new_config):
+            _page_cache.clear()
             return jsonify({"success": True, "message": "Configuration saved"})
         else:
             return jsonify({"success": False, "message": "Failed to save configuration"}), 500
@@ -231,7 +294,7 @@ def api_test_api():
 
     # If key is masked, use existing
     if api_key.startswith("****"):
-        config = load_env()
+        config = load_env_cached()
         api_key = config.get("API_KEY", "")
 
     success, message, result = test_api_connection(url, api_key)
@@ -304,6 +367,55 @@ def api_test_allsky():
     })
 
 
+def _test_sqm_slot(host, port):
+    """test_sqm_connection() for a configured slot; a bad port fails only that slot."""
+    try:
+        port = int(port or 10001)
+    except ValueError:
+        return False, f"Invalid port: {port}", None
+    return test_sqm_connection(host, port)
+
+
+@app.route("/api/test/all", methods=["POST"])
+@requires_auth
+def api_test_all():
+    """Test every configured SQM, Davis and Cloudwatcher device at once."""
+    config = load_env_cached()
+
+    # Probes run concurrently, so a dead host costs one timeout, not one each
+    with ThreadPoolExecutor(max_workers=9) as pool:
+        jobs = [
+            ("sqm", i, pool.submit(_test_sqm_slot, host, config.get(port_key)))
+            for i, host_key, port_key in _SQM_SLOTS
+            if (host := config.get(host_key))
+        ]
+        jobs += [
+            ("davis", i, pool.submit(test_weatherlink_connection, host))
+            for i, host_key, _ in _DAVIS_SLOTS
+            if (host := config.get(host_key))
+        ]
+        jobs += [
+            ("cloudwatcher", i, pool.submit(test_cloudwatcher_connection, host))
+            for i, host_key, _ in _CLOUDWATCHER_SLOTS
+            if (host := config.get(host_key))
+        ]
+
+        results = {"sqm": [], "davis": [], "cloudwatcher": []}
+        for kind, slot, future in jobs:
+            try:
+                success, message, result = future.result()
+            except Exception as e:
+                success, message, result = False, str(e), None
+            results[kind].append({
+                "slot": slot,
+                "success": success,
+                "message": message,
+                "data": result,
+            })
+
+    return jsonify(results)
+
+
 @app.route("/api/service/<action>", methods=["POST"])
 @requires_auth
 def api_service_control(action):
@@ -321,15 +433,25 @@ def api_service_control(action):
 @app.route("/api/logs")
 @requires_auth
 def api_logs():
-    """Get recent log entries."""
+    """Get recent log entries (plain text when unfiltered, JSON otherwise)."""
     lines = request.args.get("lines", 100, type=int)
     level = request.args.get("level", "ALL")
 
-    log_entries = get_logs(lines, level)
-    return jsonify({
-        "logs": log_entries,
-        "count": len(log_entries),
-    })
+    if level == "ALL":
+        # Unfiltered tail: pass journalctl's output through without
+        # splitting it into a list and JSON-escaping every line
+        return Response(get_raw_logs(lines), mimetype="text/plain")
+
+    def generate():
+        # Emit {"logs": [...], "count": n} entry by entry as journalctl is read
+        count = 0
+        yield '{"logs":['
+        for entry in iter_logs(lines, level):
+            yield ("," if count else "") + app.json.dumps(entry)
+            count += 1
+        yield f'],"count":{count}}}'
+
+    return Response(generate(), mimetype="application/json", direct_passthrough=True)
 
 
 # =============================================================================
@@ -349,4 +471,6 @@ if __name__ == "__main__":
         print("  Set CONFIGURATOR_PASSWORD env var to enable")
     print("=" * 60)
 
-    app.run(host="0.0.0.0", port=8080, debug=False)
+    # One thread per request, so a slow /api/test/* probe (up to its 10s
+    # timeout) never blocks the status page or other tests
+    app.run(host="0.0.0.0", port=8080, debug=False, threaded=True)
@@ -1,20 +1,26 @@
 """
 Utility functions for the Observatory Configurator.
 Handles .env file management, service control, and connection testing.
+
+`requests` is imported inside the connection tests that use it, so pages
+that never run a test don't pay for importing it.
 """
 
 import os
 import re
+import signal
 import socket
 import subprocess
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-
-import requests
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 # Path to the collector's .env file (parent directory)
 ENV_FILE = Path(__file__).parent.parent / ".env"
 
+# ((st_mtime_ns, st_size) of ENV_FILE, parsed config) for load_env_cached()
+_env_cache: Tuple[Optional[tuple], Optional[Dict[str, str]]] = (None, None)
+
 # Default configuration values
 # Multi-device: up to 3 of each type (SQM, DAVIS, CLOUDWATCHER)
 DEFAULTS = {
@@ -111,8 +117,35 @@ def load_env() -> Dict[str, str]:
     return config
 
 
+def load_env_cached() -> Dict[str, str]:
+    """
+    Load configuration, re-parsing the .env file only when its mtime or size
+    changes. The dict is shared between callers: copy it before modifying.
+    """
+    global _env_cache
+    try:
+        st = ENV_FILE.stat()
+        key = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = (0, -1)  # No file: defaults only
+
+    cached_key, cached_config = _env_cache
+    if key == cached_key:
+        return cached_config
+
+    config = load_env()
+    _env_cache = (key, config)
+    return config
+
+
+def env_version() -> Optional[tuple]:
+    """(st_mtime_ns, st_size) of the .env behind the last load_env_cached() result."""
+    return _env_cache[0]
+
+
 def save_env(config: Dict[str, str]) -> bool:
     """Save configuration to .env file."""
+    global _env_cache
     try:
         lines = [
             "# Observatory Collector Configuration",
@@ -187,6 +220,9 @@ def save_env(config: Dict[str, str]) -> bool:
         with open(ENV_FILE, "w") as f:
             f.write("\n".join(lines))
 
+        # Coarse filesystem timestamps could hide a same-size rewrite
+        _env_cache = (None, None)
+
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
@@ -270,28 +306,66 @@ def control_service(action: str) -> Tuple[bool, str]:
         return False, str(e)
 
 
-def get_logs(lines: int = 100, level: Optional[str] = None) -> list:
-    """Get recent log entries from journalctl."""
+def _journal_cmd(lines: int) -> list:
+    """journalctl command for the collector's last `lines` entries."""
+    return ["journalctl", "-u", "observatory-collector", "-n", str(lines), "--no-pager", "-o", "short-iso"]
+
+
+def get_raw_logs(lines: int = 100) -> bytes:
+    """Get recent log output from journalctl as raw text, one entry per line."""
     try:
-        cmd = ["journalctl", "-u", "observatory-collector", "-n", str(lines), "--no-pager", "-o", "short-iso"]
+        proc = subprocess.run(_journal_cmd(lines), capture_output=True, timeout=10)
+        return proc.stdout
+    except Exception as e:
+        return f"Error fetching logs: {e}\n".encode()
 
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
 
-        log_lines = proc.stdout.strip().split("\n") if proc.stdout else []
+def iter_logs(lines: int = 100, level: Optional[str] = None) -> Iterator[str]:
+    """Yield recent log entries from journalctl as they are read, filtered by level."""
+    # Precompiled case-insensitive search: no upper-cased copy of every line
+    matches = re.compile(re.escape(level), re.IGNORECASE).search if level and level != "ALL" else None
+    try:
+        proc = subprocess.Popen(
+            _journal_cmd(lines), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            start_new_session=True,  # Own process group, so a kill reaches any children
+        )
+    except Exception as e:
+        yield f"Error fetching logs: {e}"
+        return
 
-        # Filter by level if specified
-        if level and level != "ALL":
-            level_upper = level.upper()
-            log_lines = [l for l in log_lines if level_upper in l.upper()]
+    # Same limit subprocess.run(timeout=10) gave: a hung journalctl is
+    # killed, which ends the stdout loop below
+    timed_out = threading.Event()
 
-        return log_lines
+    def kill_on_timeout():
+        timed_out.set()
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
 
-    except Exception as e:
-        return [f"Error fetching logs: {e}"]
+    deadline = threading.Timer(10, kill_on_timeout)
+    deadline.daemon = True
+    deadline.start()
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if matches is None or matches(line):
+                yield line
+        if timed_out.is_set():
+            yield "Error fetching logs: journalctl timed out after 10 seconds"
+    finally:
+        # Also runs if the client goes away mid-stream
+        deadline.cancel()
+        proc.kill()
+        proc.wait()
+        proc.stdout.close()
 
 
 def test_api_connection(url: str, api_key: str) -> Tuple[bool, str, Optional[Dict]]:
     """Test connection to the Vercel API."""
+    import requests
+
     try:
         # Test the /api/current endpoint (read-only, no auth needed)
         base_url = url.replace("/api/ingest", "")
@@ -369,6 +443,8 @@ def test_sqm_connection(host: str, port: int = 10001) -> Tuple[bool, str, Option
 
 def test_weatherlink_connection(host: str) -> Tuple[bool, str, Optional[Dict]]:
     """Test connection to WeatherLink Live device."""
+    import requests
+
     if not host:
         return False, "No host configured", None
 
@@ -413,6 +489,8 @@ def test_weatherlink_connection(host: str) -> Tuple[bool, str, Optional[Dict]]:
 
 def test_cloudwatcher_connection(host: str) -> Tuple[bool, str, Optional[Dict]]:
     """Test connection to AAG Cloudwatcher CGI interface."""
+    import requests
+
     if not host:
         return False, "No host configured", None
 
@@ -453,17 +531,22 @@ def test_allsky_image(path: str = None, url: str = None) -> Tuple[bool, str, Opt
     """Test AllSky image availability."""
     # Try local file first
     if path:
-        file_path = Path(path)
-        if file_path.exists():
+        try:
+            st = os.stat(path)  # One syscall; the image itself is never opened
+        except OSError:
+            st = None
+        if st is not None:
             import time
-            age = time.time() - file_path.stat().st_mtime
+            age = time.time() - st.st_mtime
             if age < 300:
-                return True, f"File available (age: {int(age)}s)", str(file_path)
+                return True, f"File available (age: {int(age)}s)", str(Path(path))
             else:
                 return False, f"File too old ({int(age)}s)", None
 
     # Try URL
     if url:
+        import requests
+
         try:
             response = requests.head(url, timeout=10)
             if response.ok:
@@ -0,0 +1,130 @@
+import { NextRequest, NextResponse } from "next/server";
+import { createServiceClient } from "@/lib/supabase";
+import { BatchEventsPayload, UpdateRoofStatusPayload } from "@/types/client";
+
+const INGEST_API_KEY = process.env.INGEST_API_KEY;
+
+/**
+ * POST /api/clients/:slug/events
+ * Apply a batch of announcement and roof status events in one request
+ *
+ * Requires: Bearer token authentication
+ * Used by: Raspberry Pi collector (flushed once per push cycle)
+ *
+ * Announcements are inserted in a single statement. Roof status events are
+ * merged in order so only the final state is written.
+ */
+export async function POST(
+  request: NextRequest,
+  { params }: { params: Promise<{ slug: string }> }
+) {
+  const { slug } = await params;
+
+  // Verify API key
+  const authHeader = request.headers.get("Authorization");
+  if (!authHeader || authHeader !== `Bearer ${INGEST_API_KEY}`) {
+    return NextResponse.json(
+      { error: "Unauthorized" },
+      { status: 401 }
+    );
+  }
+
+  try {
+    const supabase = createServiceClient();
+    const { events }: BatchEventsPayload = await request.json();
+
+    if (!Array.isArray(events)) {
+      return NextResponse.json(
+        { error: "events array is required" },
+        { status: 400 }
+      );
+    }
+
+    // Find client by slug
+    const { data: client, error: clientError } = await supabase
+      .from("clients")
+      .select("id")
+      .eq("slug", slug)
+      .single();
+
+    if (clientError || !client) {
+      return NextResponse.json(
+        { error: "Client not found" },
+        { status: 404 }
+      );
+    }
+
+    const now = new Date().toISOString();
+    const announcements = [];
+    let roofUpdate: UpdateRoofStatusPayload | null = null;
+
+    for (const event of events) {
+      if (event.kind === "announcement") {
+        const payload = event.payload;
+        if (!payload?.title || !payload?.content) continue;
+        announcements.push({
+          client_id: client.id,
+          title: payload.title,
+          content: payload.content,
+          type: payload.type || "info",
+          priority: payload.priority || 0,
+          is_motd: payload.is_motd || false,
+          published_at: payload.published_at || now,
+          expires_at: payload.expires_at || null,
+          created_by: payload.created_by || "api",
+        });
+      } else if (event.kind === "roof_status") {
+        const update: UpdateRoofStatusPayload = { ...roofUpdate, ...event.payload };
+        // A recovery clears an error reported earlier in the same batch
+        if (event.payload?.is_operational === true && event.payload.error_message === undefined) {
+          update.error_message = null;
+        }
+        roofUpdate = update;
+      }
+    }
+
+    if (announcements.length > 0) {
+      const { error: insertError } = await supabase
+        .from("announcements")
+        .insert(announcements);
+
+      if (insertError) {
+        console.error("Error inserting batched announcements:", insertError);
+        return NextResponse.json(
+          { error: "Failed to create announcements" },
+          { status: 500 }
+        );
+      }
+    }
+
+    if (roofUpdate) {
+      const { error: updateError } = await supabase
+        .from("roof_status")
+        .update({
+          ...roofUpdate,
+          updated_at: now,
+        })
+        .eq("client_id", client.id);
+
+      if (updateError) {
+        console.error("Error updating roof status:", updateError);
+        return NextResponse.json(
+          { error: "Failed to update roof status" },
+          { status: 500 }
+        );
+      }
+    }
+
+    return NextResponse.json({
+      success: true,
+      announcements_created: announcements.length,
+      roof_updated: roofUpdate !== null,
+    });
+  } catch (error) {
+    console.error("Batched events error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 }
+    );
+  }
+}
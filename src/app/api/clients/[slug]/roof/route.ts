@@ -7,6 +7,8 @@ const INGEST_API_KEY = process.env.INGEST_API_KEY;
 /**
  * GET /api/clients/:slug/roof
  * Fetch current roof status for a client
+ *
+ * Supports If-None-Match revalidation (304 when unchanged)
  */
 export async function GET(
   request: NextRequest,
@@ -46,15 +48,24 @@ export async function GET(
       );
     }
 
+    // Weak ETag from the last update time so pollers can revalidate cheaply
+    const etag = `W/"${roofStatus.updated_at}"`;
+    const cacheHeaders = {
+      "Cache-Control": "public, max-age=10, s-maxage=20, stale-while-revalidate=60",
+      ETag: etag,
+    };
+
+    if (request.headers.get("If-None-Match") === etag) {
+      return new NextResponse(null, { status: 304, headers: cacheHeaders });
+    }
+
     return NextResponse.json(
       {
         success: true,
         data: roofStatus,
       },
       {
-        headers: {
-          "Cache-Control": "public, max-age=10, s-maxage=20, stale-while-revalidate=60",
-        },
+        headers: cacheHeaders,
       }
     );
   } catch (error) {
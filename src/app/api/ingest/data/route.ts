@@ -1,10 +1,16 @@
+import { gunzipSync } from "node:zlib";
 import { NextRequest, NextResponse } from "next/server";
 import { z } from "zod";
 import { createServiceClient } from "@/lib/supabase";
 import { getOrCreateInstrument } from "@/lib/instruments";
 import { createLogger } from "@/lib/logger";
 import { validateIngestKey } from "@/lib/api-auth";
-import { IngestPayloadSchema, formatZodError } from "@/lib/validation";
+import {
+  IngestBatchSchema,
+  IngestPayloadSchema,
+  ValidatedIngestPayload,
+  formatZodError,
+} from "@/lib/validation";
 import {
   BadRequestError,
   UnauthorizedError,
@@ -14,6 +20,27 @@ import {
 
 const logger = createLogger("api/ingest/data");
 
+/**
+ * Read the JSON request body. The collector gzips its batched pushes and
+ * marks them with `Content-Encoding: gzip`; plain JSON is still accepted.
+ */
+async function readJsonBody(request: NextRequest): Promise<unknown> {
+  if (request.headers.get("Content-Encoding") === "gzip") {
+    const compressed = Buffer.from(await request.arrayBuffer());
+    return JSON.parse(gunzipSync(compressed).toString("utf-8"));
+  }
+  return request.json();
+}
+
+/**
+ * POST /api/ingest/data
+ *
+ * Accepts either a single instrument reading, or a batch of readings as
+ * `{ "batch": [reading, ...] }` so the collector can push every instrument
+ * in one request. A batch is written with one insert per table. Invalid
+ * readings in a batch are skipped and listed under `rejected` (by index);
+ * the batch only fails if none of its readings are valid.
+ */
 export async function POST(request: NextRequest) {
   const requestId = generateRequestId();
 
@@ -26,34 +53,93 @@ export async function POST(request: NextRequest) {
   }
 
   try {
-    const rawData = await request.json();
+    const rawData = (await readJsonBody(request)) as { batch?: unknown } | null;
+    const isBatch = Array.isArray(rawData?.batch);
 
     // Validate payload with Zod
-    const parseResult = IngestPayloadSchema.safeParse(rawData);
-    if (!parseResult.success) {
-      logger.warn("Invalid ingest payload", {
-        requestId,
-        errors: parseResult.error.issues.length,
+    let items: ValidatedIngestPayload[];
+    const rejected: Record<string, unknown>[] = [];
+    if (isBatch) {
+      const parseResult = IngestBatchSchema.safeParse(rawData);
+      if (!parseResult.success) {
+        logger.warn("Invalid ingest batch", {
+          requestId,
+          errors: parseResult.error.issues.length,
+        });
+        return errorResponse(
+          new BadRequestError("Validation error", formatZodError(parseResult.error)),
+          requestId
+        );
+      }
+
+      // Validate each reading separately: valid ones are stored, invalid
+      // ones are reported back by index without failing the whole batch
+      items = [];
+      parseResult.data.batch.forEach((raw, index) => {
+        const itemResult = IngestPayloadSchema.safeParse(raw);
+        if (itemResult.success) {
+          items.push(itemResult.data);
+          return;
+        }
+        const code = (raw as { instrument_code?: unknown } | null)?.instrument_code;
+        rejected.push({
+          index,
+          instrument_code: typeof code === "string" ? code : null,
+          ...formatZodError(itemResult.error),
+        });
       });
-      return errorResponse(
-        new BadRequestError("Validation error", formatZodError(parseResult.error)),
-        requestId
-      );
+
+      if (rejected.length > 0) {
+        logger.warn("Rejected invalid readings in ingest batch", {
+          requestId,
+          rejected: rejected.length,
+          accepted: items.length,
+        });
+      }
+      if (items.length === 0) {
+        return errorResponse(
+          new BadRequestError("Validation error", { rejected }),
+          requestId
+        );
+      }
+    } else {
+      const parseResult = IngestPayloadSchema.safeParse(rawData);
+      if (!parseResult.success) {
+        logger.warn("Invalid ingest payload", {
+          requestId,
+          errors: parseResult.error.issues.length,
+        });
+        return errorResponse(
+          new BadRequestError("Validation error", formatZodError(parseResult.error)),
+          requestId
+        );
+      }
+      items = [parseResult.data];
     }
 
-    const data = parseResult.data;
     const supabase = createServiceClient();
     const timestamp = new Date().toISOString();
 
-    // Get instrument code (default if not provided for backward compatibility)
-    const instrumentCode = data.instrument_code || "default";
+    // Get instrument codes (default if not provided for backward compatibility)
+    const instrumentCodes = items.map((data) => data.instrument_code || "default");
 
-    // Get or create the instrument (auto-registration)
-    const instrumentId = await getOrCreateInstrument(supabase, instrumentCode, data);
+    // Get or create the instruments (auto-registration). Replayed batches can
+    // hold several readings per instrument, so each code is resolved once;
+    // concurrent lookups of a new code would race to insert it twice.
+    const firstItemByCode = new Map<string, ValidatedIngestPayload>();
+    instrumentCodes.forEach((code, i) => {
+      if (!firstItemByCode.has(code)) firstItemByCode.set(code, items[i]);
+    });
+    const uniqueCodes = Array.from(firstItemByCode.keys());
+    const uniqueIds = await Promise.all(
+      uniqueCodes.map((code) => getOrCreateInstrument(supabase, code, firstItemByCode.get(code)!))
+    );
+    const idByCode = new Map(uniqueCodes.map((code, i) => [code, uniqueIds[i]]));
+    const instrumentIds = instrumentCodes.map((code) => idByCode.get(code)!);
 
-    // Prepare the reading record
-    const readingRecord = {
-      instrument_id: instrumentId,
+    // Prepare the reading records
+    const readingRecords = items.map((data, i) => ({
+      instrument_id: instrumentIds[i],
       temperature: data.temperature ?? null,
       humidity: data.humidity ?? null,
       pressure: data.pressure ?? null,
@@ -71,18 +157,18 @@ export async function POST(request: NextRequest) {
       sky_quality: data.sky_quality ?? null,
       sqm_temperature: data.sqm_temperature ?? null,
       is_outlier: false, // Will be updated by trigger/function if needed
-      created_at: timestamp,
-    };
+      created_at: data.reading_at ?? timestamp, // Spooled readings keep their own time
+    }));
 
     // Insert into instrument_readings (new multi-instrument table)
     const { error: readingError } = await supabase
       .from("instrument_readings")
-      .insert(readingRecord);
+      .insert(readingRecords);
 
     if (readingError) {
       logger.error("Error inserting instrument reading", readingError, {
         requestId,
-        instrumentCode,
+        instrumentCodes,
       });
       return NextResponse.json(
         { error: "Failed to insert instrument reading" },
@@ -90,29 +176,29 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Update the instrument's last_reading_at timestamp
+    // Update the instruments' last_reading_at timestamp
     const { data: updateResult, error: updateError } = await supabase
       .from("instruments")
       .update({ last_reading_at: timestamp, updated_at: timestamp })
-      .eq("id", instrumentId)
+      .in("id", uniqueIds)
       .select("id, code, last_reading_at");
 
     if (updateError) {
       logger.error("Error updating instrument last_reading_at", updateError, {
         requestId,
-        instrumentCode,
-        instrumentId,
+        instrumentCodes,
+        instrumentIds,
       });
     } else if (!updateResult || updateResult.length === 0) {
       logger.warn("No rows updated for instrument", {
         requestId,
-        instrumentCode,
-        instrumentId,
+        instrumentCodes,
+        instrumentIds,
       });
     }
 
     // BACKWARD COMPATIBILITY: Also update legacy tables
-    const legacyRecord = {
+    const legacyRecords = items.map((data) => ({
       temperature: data.temperature ?? null,
       humidity: data.humidity ?? null,
       pressure: data.pressure ?? null,
@@ -131,21 +217,28 @@ export async function POST(request: NextRequest) {
       sqm_temperature: data.sqm_temperature ?? null,
       lora_sensors: data.lora_sensors ?? null,
       updated_at: timestamp,
-    };
+    }));
 
-    // Update current conditions (upsert) - legacy table
-    const { error: currentError } = await supabase
-      .from("current_conditions")
-      .upsert({ id: 1, ...legacyRecord });
+    // Update current conditions (upsert) - legacy table. Each record replaces
+    // the whole row, so only the last one in the batch would survive anyway.
+    // Batches made only of replayed (spooled) readings leave it alone.
+    const liveRecords = legacyRecords.filter((_, i) => !items[i].reading_at);
+    if (liveRecords.length > 0) {
+      const { error: currentError } = await supabase
+        .from("current_conditions")
+        .upsert({ id: 1, ...liveRecords[liveRecords.length - 1] });
 
-    if (currentError) {
-      logger.warn("Error updating legacy current_conditions", { requestId, error: currentError.message });
+      if (currentError) {
+        logger.warn("Error updating legacy current_conditions", { requestId, error: currentError.message });
+      }
     }
 
     // Also insert into historical readings - legacy table
     const { error: historyError } = await supabase
       .from("weather_readings")
-      .insert({ ...legacyRecord, created_at: timestamp });
+      .insert(
+        legacyRecords.map((record, i) => ({ ...record, created_at: items[i].reading_at ?? timestamp }))
+      );
 
     if (historyError) {
       logger.warn("Error inserting legacy weather_readings", { requestId, error: historyError.message });
@@ -153,15 +246,25 @@ export async function POST(request: NextRequest) {
 
     logger.info("Ingest successful", {
       requestId,
-      instrumentCode,
-      hasTemperature: data.temperature != null,
-      hasSkyQuality: data.sky_quality != null,
+      instrumentCodes,
+      hasTemperature: items.some((data) => data.temperature != null),
+      hasSkyQuality: items.some((data) => data.sky_quality != null),
     });
 
+    if (isBatch) {
+      return NextResponse.json({
+        success: true,
+        timestamp,
+        instruments: instrumentCodes,
+        rejected,
+        requestId,
+      });
+    }
+
     return NextResponse.json({
       success: true,
       timestamp,
-      instrument: instrumentCode,
+      instrument: instrumentCodes[0],
       requestId,
     });
   } catch (error) {
@@ -33,20 +33,36 @@ export async function POST(request: NextRequest) {
 
   try {
     const supabase = createServiceClient();
-    const formData = await request.formData();
-    const file = formData.get("image") as File | null;
+    const requestType = request.headers.get("Content-Type") || "";
+    let fileType: string;
+    let buffer: Buffer;
+
+    if (requestType.startsWith("image/")) {
+      // Raw image body (the collector skips multipart framing)
+      fileType = requestType;
+      buffer = Buffer.from(await request.arrayBuffer());
+      if (buffer.length === 0) {
+        return NextResponse.json({ error: "No image provided" }, { status: 400 });
+      }
+    } else {
+      const formData = await request.formData();
+      const file = formData.get("image") as File | null;
 
-    if (!file) {
-      return NextResponse.json({ error: "No image provided" }, { status: 400 });
-    }
+      if (!file) {
+        return NextResponse.json({ error: "No image provided" }, { status: 400 });
+      }
+
+      // Validate file type
+      if (!file.type.startsWith("image/")) {
+        return NextResponse.json({ error: "Invalid file type" }, { status: 400 });
+      }
 
-    // Validate file type
-    if (!file.type.startsWith("image/")) {
-      return NextResponse.json({ error: "Invalid file type" }, { status: 400 });
+      fileType = file.type;
+      buffer = Buffer.from(await file.arrayBuffer());
     }
 
     // Limit file size to 10MB
-    if (file.size > 10 * 1024 * 1024) {
+    if (buffer.length > 10 * 1024 * 1024) {
       return NextResponse.json(
         { error: "File too large (max 10MB)" },
         { status: 400 }
@@ -54,13 +70,12 @@ export async function POST(request: NextRequest) {
     }
 
     const timestamp = new Date().toISOString();
-    const buffer = Buffer.from(await file.arrayBuffer());
 
     // Upload as 'latest.jpg' (overwrites previous)
     const { error: latestError } = await supabase.storage
       .from(BUCKET_NAME)
       .upload("latest.jpg", buffer, {
-        contentType: file.type,
+        contentType: fileType,
         upsert: true,
         cacheControl: "60",
       });
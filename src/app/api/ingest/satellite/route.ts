@@ -31,12 +31,35 @@ export async function POST(request: NextRequest) {
 
   try {
     const supabase = createServiceClient();
-    const formData = await request.formData();
-    const file = formData.get("image") as File | null;
-    const productId = formData.get("product_id") as string | null;
-
-    if (!file) {
-      return NextResponse.json({ error: "No image provided" }, { status: 400 });
+    const requestType = request.headers.get("Content-Type") || "";
+    let fileType: string;
+    let productId: string | null;
+    let buffer: Buffer;
+
+    if (requestType.startsWith("image/")) {
+      // Raw image body with ?product_id= (the collector skips multipart framing)
+      fileType = requestType;
+      productId = request.nextUrl.searchParams.get("product_id");
+      buffer = Buffer.from(await request.arrayBuffer());
+      if (buffer.length === 0) {
+        return NextResponse.json({ error: "No image provided" }, { status: 400 });
+      }
+    } else {
+      const formData = await request.formData();
+      const file = formData.get("image") as File | null;
+      productId = formData.get("product_id") as string | null;
+
+      if (!file) {
+        return NextResponse.json({ error: "No image provided" }, { status: 400 });
+      }
+
+      // Validate file type
+      if (!file.type.startsWith("image/")) {
+        return NextResponse.json({ error: "Invalid file type" }, { status: 400 });
+      }
+
+      fileType = file.type;
+      buffer = Buffer.from(await file.arrayBuffer());
     }
 
     if (!productId || !isValidProductId(productId)) {
@@ -46,23 +69,16 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Validate file type
-    if (!file.type.startsWith("image/")) {
-      return NextResponse.json({ error: "Invalid file type" }, { status: 400 });
-    }
-
     // Limit file size to 5MB for satellite images
-    if (file.size > 5 * 1024 * 1024) {
+    if (buffer.length > 5 * 1024 * 1024) {
       return NextResponse.json(
         { error: "File too large (max 5MB)" },
         { status: 400 }
       );
     }
 
-    const buffer = Buffer.from(await file.arrayBuffer());
-
     // Determine file extension based on content type
-    const isGif = file.type === "image/gif";
+    const isGif = fileType === "image/gif";
     const extension = isGif ? "gif" : "jpg";
 
     // Upload to bom-satellite/{productId}.{ext}
@@ -70,7 +86,7 @@ export async function POST(request: NextRequest) {
     const { error: uploadError } = await supabase.storage
       .from(BUCKET_NAME)
       .upload(filename, buffer, {
-        contentType: file.type,
+        contentType: fileType,
         upsert: true,
         cacheControl: "300", // 5 minute cache
       });
@@ -87,10 +87,20 @@ export const IngestPayloadSchema = z.object({
 
   // LoRa sensors (flexible structure)
   lora_sensors: z.record(z.string(), z.unknown()).nullish().transform(nullToUndefined),
+
+  // When the reading was taken, for readings replayed from the collector's spool
+  reading_at: z.string().datetime().optional(),
 }).passthrough(); // Allow additional fields for forward compatibility
 
 export type ValidatedIngestPayload = z.infer<typeof IngestPayloadSchema>;
 
+// Batched ingest: one reading per instrument in a single request. Only the
+// envelope is checked here; each item is validated against
+// IngestPayloadSchema on its own so one bad reading can't reject the rest.
+export const IngestBatchSchema = z.object({
+  batch: z.array(z.unknown()).min(1).max(50),
+});
+
 // Heartbeat payload schema
 export const HeartbeatPayloadSchema = z.object({
   status: z.enum(["healthy", "degraded", "offline"]).optional(),
@@ -147,7 +147,19 @@ export interface UpdateRoofStatusPayload {
   position?: number | null;
   last_command?: RoofCommand | null;
   is_operational?: boolean;
-  error_message?: string;
+  error_message?: string | null;
+}
+
+// ─────────────────────────────────────────────────────────────────────────────
+// BATCHED CLIENT EVENTS
+// ─────────────────────────────────────────────────────────────────────────────
+
+export type ClientEvent =
+  | { kind: "announcement"; payload: CreateAnnouncementPayload }
+  | { kind: "roof_status"; payload: UpdateRoofStatusPayload };
+
+export interface BatchEventsPayload {
+  events: ClientEvent[];
 }
 
 // ─────────────────────────────────────────────────────────────────────────────